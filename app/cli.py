@@ -0,0 +1,234 @@
+"""无界面批量识别入口（不依赖 PySide6，可在无显示器的服务器上运行）
+
+用法示例：
+    python -m app.cli app_data/snapshots                       # 结果写入 ocr_results 表（跳过已入库的图片）
+    python -m app.cli app_data/snapshots --reimport            # 重新识别并更新已入库图片的记录
+    python -m app.cli "images/*.jpg" -o results.jsonl           # 写入 JSONL
+    python -m app.cli images -r -o results.csv --workers 4      # 递归目录，写入 CSV
+"""
+from __future__ import annotations
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from typing import Iterator, List, Optional
+
+# ensure project root is importable
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from app.core.db import init_db
+from app.core.persistence import existing_image_paths, result_store_from_config, update_by_image_path
+from app.core.config import load_config
+from app.core.snapshot import dump_annotations, is_annotated_snapshot, parse_roi, snapshot_to_frame
+from app.services.ocr_pipeline import OCRPipeline, default_batch_workers
+
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff')
+OUTPUT_FORMATS = ('sqlite', 'jsonl', 'csv')
+CSV_FIELDS = ('source', 'text', 'confidence', 'boxes', 'error')
+
+
+def iter_image_paths(inputs: List[str], recursive: bool = False) -> Iterator[str]:
+    """展开目录 / 通配符 / 文件为图片路径（按路径排序，去重）
+
+    目录与通配符展开时跳过应用保存的带标注结果图（result_*），直接给出的文件不受影响。
+    """
+    seen = set()
+    for spec in inputs:
+        if os.path.isdir(spec):
+            if recursive:
+                paths = [os.path.join(root, name) for root, _, names in os.walk(spec) for name in names]
+            else:
+                paths = [os.path.join(spec, name) for name in os.listdir(spec)]
+        elif glob.has_magic(spec):
+            paths = glob.glob(spec, recursive=recursive)
+        else:
+            paths = [spec]
+        expanded = os.path.isdir(spec) or glob.has_magic(spec)
+        for path in sorted(paths):
+            if not os.path.isfile(path) or not path.lower().endswith(IMAGE_EXTS):
+                continue
+            if expanded and is_annotated_snapshot(path):
+                continue
+            key = os.path.abspath(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield path
+
+
+def _infer_format(output: Optional[str], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    if output:
+        ext = os.path.splitext(output)[1].lower()
+        if ext in ('.jsonl', '.json'):
+            return 'jsonl'
+        if ext == '.csv':
+            return 'csv'
+    return 'sqlite'
+
+
+class _SqliteSink:
+    """写入 ocr_results 表，按配置 persistence 段的 batch_size / commit_interval_ms 批量提交
+
+    记录以图片绝对路径作为 image_path；existing（{image_path: roi_json}）中的路径已入库，更新原记录的
+    文本、置信度与标注而不是再插入一条。应用保存的 ROI 快照带有 roi_json，其标注为整帧坐标，
+    重新识别得到的快照坐标按原 roi_json 换算回整帧坐标，roi_json 保持不变。
+    """
+
+    def __init__(self, cfg: dict, existing=None):
+        init_db()
+        self._store = result_store_from_config(cfg)
+        self._existing = dict(existing or {})
+        self._updates: List[dict] = []
+        self.inserted = 0
+        self.updated = 0
+
+    def write(self, result: dict):
+        if result.get('error'):
+            return
+        row = {
+            'image_path': os.path.abspath(result['source']),
+            'processed_image_path': None,  # 查看时按 det_boxes_json 重绘标注
+            'date_text': result['text'],
+            'confidence': float(result['confidence']),
+            'det_boxes_json': dump_annotations(result['boxes'], result['texts'], result['scores']),
+            'roi_json': None,  # 标注为图片自身坐标
+        }
+        if row['image_path'] in self._existing:
+            roi_json = self._existing[row['image_path']]
+            if roi_json:
+                frame_boxes = snapshot_to_frame(result['boxes'], parse_roi(roi_json))
+                row['det_boxes_json'] = dump_annotations(frame_boxes, result['texts'], result['scores'])
+            self._updates.append(row)
+            if len(self._updates) >= self._store.batch_size:
+                self._flush_updates()
+        else:
+            self.inserted += len(self._store.add(row))
+
+    def _flush_updates(self):
+        rows, self._updates = self._updates, []
+        self.updated += update_by_image_path(rows)
+
+    def close(self):
+        self._flush_updates()
+        self.inserted += len(self._store.close())
+
+
+class _JsonlSink:
+    def __init__(self, path: str):
+        self._fh = open(path, 'w', encoding='utf-8')
+
+    def write(self, result: dict):
+        record = {k: result.get(k) for k in ('source', 'text', 'confidence', 'boxes', 'texts', 'scores', 'error')}
+        self._fh.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._fh.close()
+
+
+class _CsvSink:
+    def __init__(self, path: str):
+        # utf-8-sig 便于 Excel 直接打开中文
+        self._fh = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._fh)
+        self._writer.writerow(CSV_FIELDS)
+
+    def write(self, result: dict):
+        self._writer.writerow([
+            result.get('source'),
+            result.get('text'),
+            f"{float(result.get('confidence') or 0.0):.4f}",
+            json.dumps(result.get('boxes') or [], ensure_ascii=False),
+            result.get('error') or '',
+        ])
+
+    def close(self):
+        self._fh.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m app.cli', description='无界面批量 OCR 识别')
+    parser.add_argument('inputs', nargs='+', help='图片文件、目录或通配符（如 "snapshots/*.jpg"）')
+    parser.add_argument('-r', '--recursive', action='store_true', help='递归处理子目录（通配符支持 **）')
+    parser.add_argument('-o', '--output', help='输出文件；扩展名 .jsonl / .csv 决定格式，省略则写入数据库')
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, help='输出格式（默认按 --output 扩展名推断）')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help=f'工作进程数（默认 {default_batch_workers()}，0 表示在当前进程内执行）')
+    parser.add_argument('--config', help='JSON 配置文件；默认读取应用数据库中的配置')
+    parser.add_argument('--no-preprocess', action='store_true', help='跳过图像预处理')
+    parser.add_argument('--reimport', action='store_true',
+                        help='写入数据库时重新识别已入库的图片并更新原记录（默认跳过 image_path 已存在的图片，'
+                             '重复运行不会产生重复记录）')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    fmt = _infer_format(args.output, args.format)
+    if fmt != 'sqlite' and not args.output:
+        print(f"[ERROR] {fmt} 格式需要指定 --output")
+        return 2
+
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as fh:
+            cfg = json.load(fh)
+    else:
+        init_db()
+        cfg = load_config()
+
+    paths = list(iter_image_paths(args.inputs, args.recursive))
+    if not paths:
+        print("[ERROR] 没有找到图片")
+        return 1
+
+    existing = {}
+    if fmt == 'sqlite':
+        init_db()
+        existing = existing_image_paths(os.path.abspath(p) for p in paths)
+        if existing and not args.reimport:
+            paths = [p for p in paths if os.path.abspath(p) not in existing]
+            print(f"跳过已入库的图片 {len(existing)} 张（使用 --reimport 重新识别并更新）")
+            if not paths:
+                return 0
+    print(f"共 {len(paths)} 张图片，输出: {args.output or '数据库'} ({fmt})")
+
+    if fmt == 'sqlite':
+        sink = _SqliteSink(cfg, existing)
+    elif fmt == 'jsonl':
+        sink = _JsonlSink(args.output)
+    else:
+        sink = _CsvSink(args.output)
+
+    pipeline = OCRPipeline(cfg)
+    failed = 0
+    last_report = time.perf_counter()
+    try:
+        for done, result in enumerate(pipeline.recognize_many(paths, workers=args.workers,
+                                                              preprocess=not args.no_preprocess), 1):
+            if result.get('error'):
+                failed += 1
+                print(f"[WARNING] {result['source']}: {result['error']}")
+            sink.write(result)
+            now = time.perf_counter()
+            if now - last_report >= 5.0:
+                last_report = now
+                print(f"进度: {done}/{len(paths)}")
+    finally:
+        sink.close()
+
+    stats = pipeline.last_batch_stats
+    print(f"完成: {stats.get('images', 0)} 张，失败 {failed} 张，{stats.get('images_per_sec', 0.0):.2f} 张/秒")
+    if fmt == 'sqlite':
+        print(f"数据库: 新增 {sink.inserted} 条，更新 {sink.updated} 条")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
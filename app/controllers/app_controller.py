@@ -7,26 +7,40 @@ import math
 import time
 from PySide6.QtWidgets import QApplication, QMessageBox
 from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QImage, QPalette
+from PySide6.QtGui import QImage
 import json
-from PIL import Image, ImageDraw, ImageFont
 
 from ..ui.main_window import MainWindow
 from ..services.camera import CameraWorker
-from ..core.db import get_session, OcrResult
-from ..core.config import load_config, save_config, get_resource_path
-from ..core.preprocess import apply_preprocess
+from ..services.ocr_worker import OcrWorker
+from ..services.ocr_engine import ocr_engine_available
+from ..services.ocr_warmup import OcrWarmupWorker
+from ..services.snapshot_writer import SnapshotWriter, SnapshotWrite
+from ..services.auto_capture import AutoCaptureScheduler
+from ..services.retention_worker import RetentionWorker
+from ..core.db import get_session, OcrResult, count_ocr_results, fetch_result_page
+from ..core.config import ConfigStore, get_resource_path
+from ..core.preprocess import crop_roi, get_preprocess_engine
+from ..core.metrics import metrics
+from ..core.retention import RetentionSweeper, retention_active, shard_dir
 from ..ui.image_viewer import ImageViewerDialog
+from ..utils.text_order import sort_text_by_position
+from ..utils.annotation import get_chinese_font, draw_chinese_text, render_annotations
+from ..utils.font_manager import get_font_manager
+from ..core.snapshot import (ANNOTATED_PREFIX, ROI_PREFIX, encode_snapshot, snapshot_settings, dump_annotations,
+                             dump_roi, parse_annotations, parse_roi, annotations_to_snapshot)
 
-# RapidOCR导入
-try:
-    from rapidocr import RapidOCR, EngineType, LangDet, LangRec, ModelType, OCRVersion
-except ImportError:
-    RapidOCR = None
 
 class AppController:
     def __init__(self):
-        self.cfg = load_config()
+        # 配置常驻内存，修改后合并延迟写库，退出时 flush；写库由界面线程的单次定时器触发，
+        # 与设置对话框等对配置的原地修改在同一线程
+        self._config_save_timer = QTimer()
+        self._config_save_timer.setSingleShot(True)
+        self.config_store = ConfigStore(schedule_save=self._schedule_config_save)
+        self._config_save_timer.setInterval(int(self.config_store.save_delay * 1000))
+        self._config_save_timer.timeout.connect(self.config_store.flush)
+        self.cfg = self.config_store.data
         self.win = MainWindow()
         self.win.on_refresh = self.refresh_devices
         self.win.startCamera.connect(self.start_camera)
@@ -46,6 +60,7 @@ class AppController:
         self.win.preprocessToggled.connect(self.on_preprocess_toggled)
         self.win.clearAllData.connect(self.clear_all_data)
         self.win.deleteCurrentData.connect(self.delete_current_data)
+        self.win.autoCaptureToggled.connect(self.on_auto_capture_toggled)
         # self.win.realtimeOcrToggled.connect(self.on_realtime_ocr_toggled)
         
         # theme
@@ -55,9 +70,13 @@ class AppController:
         except Exception:
             pass
         self.win.onThemeChangedCallback = self.on_theme_changed
+        self.win.set_preview_max_fps(self.cfg.get('ui', {}).get('preview_max_fps', 15))
+        self.win.view.set_roi_norm(self.cfg['camera'].get('roi_norm'))
 
         self.camera = None
         self.current_frame = None
+        self.current_frame_seq = 0
+        self.current_frame_ts = 0.0
         self.roi_norm = self.cfg['camera'].get('roi_norm')
         self.page_size = 6
         # 移除实时检测状态（性能考虑）
@@ -70,225 +89,207 @@ class AppController:
         # page-based pagination
         self.current_page = 1
         self.total_pages = 1
-        self.total_count = 0
+        self.total_count = None  # 缓存的总条数，None 表示需要重新 COUNT
+        self._page_bounds = [None]
         self._has_prev = False
         self._has_next = False
 
-        # 初始化RapidOCR
+        # RapidOCR 在窗口显示后于后台线程创建并预热，见 _init_rapidocr
         self.ocr = None
-        self._init_rapidocr()
+        self._ocr_warmup = None
+        self._started_at = time.perf_counter()
+        self._first_capture_pending = True
+
+        # OCR 推理线程：识别、绘制与保存均不在 GUI 线程执行
+        worker_cfg = self.cfg.get('ocr_worker', {}) or {}
+        self.ocr_worker = OcrWorker(
+            self._process_job,
+            queue_size=int(worker_cfg.get('queue_size', 2)),
+            overflow_policy=str(worker_cfg.get('overflow_policy', 'drop_oldest')),
+        )
+        self.ocr_worker.resultReady.connect(self.on_ocr_result)
+        self.ocr_worker.jobFailed.connect(self.on_ocr_failed)
+        self.ocr_worker.jobDropped.connect(self.on_ocr_dropped)
+        self.ocr_worker.start()
+
+        # 快照写入线程：图像文件与数据库记录在后台批量落盘
+        writer_cfg = self.cfg.get('snapshot_writer', {}) or {}
+        persist_cfg = self.cfg.get('persistence', {}) or {}
+        self.snapshot_writer = SnapshotWriter(
+            queue_size=int(writer_cfg.get('queue_size', 32)),
+            overflow_policy=str(writer_cfg.get('overflow_policy', 'block')),
+            flush_interval_ms=int(persist_cfg.get('commit_interval_ms', 100)),
+            max_batch=int(persist_cfg.get('batch_size', 50)),
+        )
+        self.snapshot_writer.rowsSaved.connect(self.on_snapshots_saved)
+        self.snapshot_writer.writeDropped.connect(self.on_snapshot_dropped)
+        self.snapshot_writer.writeFailed.connect(self.on_snapshot_failed)
+        self.snapshot_writer.start()
+
+        # 快照保留策略（需用户开启）：后台按时间 / 数量 / 总大小分批清理旧快照及记录
+        self.retention_worker = None
+        retention_cfg = self.cfg.get('retention', {}) or {}
+        if retention_active(retention_cfg):
+            from ..core.config import get_user_data_path
+            self.retention_worker = RetentionWorker(
+                RetentionSweeper(get_user_data_path('snapshots'), retention_cfg),
+                interval_sec=float(retention_cfg.get('sweep_interval_sec', 600)),
+            )
+            self.retention_worker.swept.connect(self.on_retention_swept)
+            self.retention_worker.start()
+
+        # 连续自动拍照：按 capture_interval_ms 节拍取最新帧送入 OCR 线程
+        cam_cfg = self.cfg.get('camera', {})
+        self.auto_capture = AutoCaptureScheduler(
+            int(cam_cfg.get('capture_interval_ms', 1000)),
+            is_busy=self.ocr_worker.is_busy,
+            capture=lambda: self.capture_once(auto=True),
+        )
+        self.auto_capture.rateUpdated.connect(self.on_auto_capture_rate)
+        self.win.set_auto_capture_checked(bool(cam_cfg.get('auto_capture', False)))
+
+        # 各阶段耗时统计：状态栏实时显示，定期写入 app_data/metrics.jsonl
+        metrics_cfg = self.cfg.get('metrics', {}) or {}
+        metrics.configure(bool(metrics_cfg.get('enabled', True)), int(metrics_cfg.get('window', 512)))
+        self._metrics_timer = QTimer()
+        self._metrics_timer.timeout.connect(self._refresh_metrics_readout)
+        if metrics.enabled:
+            self._metrics_timer.start(1000)
+            dump_interval = float(metrics_cfg.get('dump_interval_sec', 60) or 0)
+            if dump_interval > 0:
+                from ..core.config import get_user_data_path
+                metrics.start_dump(get_user_data_path('metrics.jsonl'), dump_interval)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
 
         self.refresh_devices()
         self.load_latest()
         self.win.show()
+        self._init_rapidocr()
         self._update_pager_buttons()
         # init preprocess toggle state from config
         self.win.set_preprocess_enabled(bool(self.cfg.get('preprocess', {}).get('enable_preprocess', True)))
 
     def _init_rapidocr(self):
-        """初始化RapidOCR"""
-        if RapidOCR is None:
+        """在后台线程创建并预热共享的RapidOCR实例（与调试窗口共用，参数来自 onnx_ocr 配置）"""
+        if not ocr_engine_available():
+            self.win.set_ocr_status('OCR不可用')
             QMessageBox.critical(self.win, '错误', 'RapidOCR未安装，请安装rapidocr-onnxruntime包')
             return
-        
-        try:
-            # 获取模型路径
-            from ..core.config import get_resource_path
-            det_path = get_resource_path('lib/models/custom_det_model/det.onnx')
-            rec_path = get_resource_path('lib/models/custom_rec_model/rec.onnx')
-            dict_path = get_resource_path('lib/models/dict_custom_chinese_date.txt')
-            
-            # 配置RapidOCR参数（与test_camera_ocr.py保持一致）
-            params = {
-                'Global.use_cls': False,
-                'Det.engine_type': EngineType.ONNXRUNTIME,
-                'Rec.engine_type': EngineType.ONNXRUNTIME,
-                'Det.lang_type': LangDet.CH,
-                'Rec.lang_type': LangRec.CH,
-                'Det.model_type': ModelType.MOBILE,
-                'Rec.model_type': ModelType.MOBILE,
-                'Det.ocr_version': OCRVersion.PPOCRV5,
-                'Rec.ocr_version': OCRVersion.PPOCRV5,
-                'Det.box_thresh': 0.3,
-                'Det.thresh': 0.1,
-                'Det.unclip_ratio': 2.0,
-                'Rec.rec_img_shape': [3, 48, 320],
-            }
-            
-            # 只有当模型文件存在时才设置模型路径
-            if all(os.path.exists(p) for p in [det_path, rec_path, dict_path]):
-                params['Det.model_path'] = det_path
-                params['Rec.model_path'] = rec_path
-                params['Rec.rec_keys_path'] = dict_path
-                print("使用自定义模型")
-            else:
-                print("模型文件不存在，使用默认模型")
-            
-            self.ocr = RapidOCR(params=params)
-            print("RapidOCR初始化成功")
-        except Exception as e:
-            print(f"RapidOCR初始化失败: {e}")
-            # 使用默认配置
-            try:
-                self.ocr = RapidOCR()
-                print("使用默认RapidOCR配置")
-            except Exception as e2:
-                QMessageBox.critical(self.win, '错误', f'RapidOCR初始化完全失败: {e2}')
-                self.ocr = None
+
+        self.win.set_ocr_status('OCR引擎加载中…')
+        self._ocr_warmup = OcrWarmupWorker(self.cfg)
+        self._ocr_warmup.ready.connect(self.on_ocr_ready)
+        self._ocr_warmup.failed.connect(self.on_ocr_init_failed)
+        self._ocr_warmup.start()
+
+    def on_ocr_ready(self, engine, stats):
+        self.ocr = engine
+        self._ocr_warmup = None
+        startup_ms = (time.perf_counter() - self._started_at) * 1000.0
+        print(f"OCR引擎预热完成: 创建 {stats['init_ms']:.0f} ms, 预热推理 {stats['warmup_ms']:.0f} ms, "
+              f"启动后 {startup_ms:.0f} ms 可用")
+        self.win.set_ocr_status(
+            'OCR就绪',
+            f"创建 {stats['init_ms']:.0f} ms，预热 {stats['warmup_ms']:.0f} ms，启动后 {startup_ms:.0f} ms 可用",
+        )
+
+    def on_ocr_init_failed(self, message: str):
+        self._ocr_warmup = None
+        self.win.set_ocr_status('OCR不可用', message)
+        QMessageBox.critical(self.win, '错误', f'RapidOCR初始化完全失败: {message}')
     
     def get_chinese_font(self, size=20):
         """获取中文字体（跨平台）"""
-        try:
-            search_paths = []
-            root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-            project_fonts = [
-                os.path.join(root, 'assets', 'fonts', 'NotoSansSC-Regular.otf'),
-                os.path.join(root, 'assets', 'fonts', 'NotoSansSC-Regular.ttf'),
-                os.path.join(root, 'assets', 'fonts', 'msyh.ttc'),
-            ]
-            search_paths.extend(project_fonts)
-
-            win_fonts = [
-                "C:/Windows/Fonts/msyh.ttc",
-                "C:/Windows/Fonts/simhei.ttf",
-                "C:/Windows/Fonts/simsun.ttc",
-                "C:/Windows/Fonts/msyh.ttf",
-            ]
-            search_paths.extend(win_fonts)
-
-            linux_fonts = [
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-                "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-                "/usr/share/fonts/truetype/noto/NotoSansSC-Regular.otf",
-                "/usr/share/fonts/truetype/noto/NotoSansSC-Regular.ttf",
-                "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
-                "/usr/share/fonts/truetype/arphic/ukai.ttf",
-                "/usr/share/fonts/truetype/arphic/uming.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-            ]
-            search_paths.extend(linux_fonts)
-
-            for font_path in search_paths:
-                if os.path.exists(font_path):
-                    try:
-                        return ImageFont.truetype(font_path, size)
-                    except Exception:
-                        continue
-            return ImageFont.load_default()
-        except Exception as e:
-            print(f"字体加载失败: {e}")
-            return ImageFont.load_default()
+        return get_chinese_font(size)
     
     def _get_text_color_for_pil(self):
-        """获取PIL绘制用的文字颜色"""
-        app = QApplication.instance()
-        if app is None:
-            return (0, 0, 0)  # 默认黑色
-        
-        # 获取当前调色板
-        palette = app.palette()
-        base_color = palette.color(QPalette.Base)
-        
-        # 判断是否为深色主题
-        is_dark = (0.2126 * base_color.redF() + 0.7152 * base_color.greenF() + 0.0722 * base_color.blueF()) < 0.5
-        
-        # 深色主题使用白色文字，浅色主题使用黑色文字
-        return (255, 255, 255) if is_dark else (0, 0, 0)
+        """获取PIL绘制用的文字颜色（按主题缓存，主题切换时失效）"""
+        return get_font_manager().text_color()
     
-    def draw_chinese_text(self, image, boxes, texts, scores):
-        """在图像上绘制中文文本"""
-        # 将OpenCV图像转换为PIL图像
-        pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(pil_image)
-        
-        # 获取中文字体
-        font = self.get_chinese_font(20)
-        
-        # 获取动态文字颜色
-        text_color = self._get_text_color_for_pil()
-        
-        for box, text, score in zip(boxes, texts, scores):
-            # 获取文本框的左上角坐标
-            x, y = int(box[0][0]), int(box[0][1])
-            
-            # 绘制文本和置信度
-            text_with_score = f"{text} ({score:.2f})"
-            
-            # 绘制文本背景
-            bbox = draw.textbbox((x, y-25), text_with_score, font=font)
-            draw.rectangle(bbox, fill=(0, 255, 0, 128))
-            
-            # 绘制文本，使用动态颜色
-            draw.text((x, y-25), text_with_score, font=font, fill=text_color)
-        
-        # 将PIL图像转换回OpenCV格式
-        return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+    def draw_chinese_text(self, image, boxes, texts, scores, text_color=None):
+        """在图像上绘制中文文本
+
+        在 OCR 线程中调用时需由 GUI 线程预先传入 text_color，避免跨线程读取调色板。
+        """
+        if text_color is None:
+            text_color = self._get_text_color_for_pil()
+        return draw_chinese_text(image, boxes, texts, scores, text_color)
     
-    def _process_with_rapidocr(self, image):
-        """使用RapidOCR处理图像"""
+    def _process_with_rapidocr(self, image, text_color=None, roi_offset=(0, 0), raw_image=None, snapshot_cfg=None):
+        """使用RapidOCR处理图像（在 OCR 线程中执行，不访问任何界面控件）
+
+        Args:
+            image: 待识别图像（ROI 区域，可能已预处理）
+            text_color: 标注文字颜色（仅在另存标注图时使用）
+            roi_offset: ROI 左上角在整帧中的坐标，用于把检测框映射回整帧
+            raw_image: 保存为快照的原始 ROI（未预处理），默认为 image
+            snapshot_cfg: 快照编码配置，见 core.snapshot
+
+        Returns:
+            dict: status 为 'ok' / 'empty' / 'failed'，成功时附带 rid、text、confidence、count，
+            以及整帧坐标下的 boxes 与对应的 texts、scores
+        """
         if self.ocr is None:
-            self.win.statusBar().showMessage("OCR未初始化")
-            return
-        
-        try:
-            self.win.statusBar().showMessage("正在识别...")
-            
-            # 执行OCR识别
+            return {'status': 'failed', 'message': 'OCR未初始化'}
+
+        # 执行OCR识别
+        with metrics.span('ocr'):
             result = self.ocr(image)
-            
-            if result is None:
-                self.win.statusBar().showMessage("识别失败")
-                return
-                
-            # 检查result.boxes是否存在且不为空
-            if not hasattr(result, 'boxes') or result.boxes is None or len(result.boxes) == 0:
-                self.win.statusBar().showMessage("未检测到文本")
-                return
-            
-            # 处理识别结果
-            boxes = result.boxes
-            texts = result.txts
-            scores = result.scores
-            
-            # 对文本进行排序（从左到右，从上到下）
+
+        if result is None:
+            return {'status': 'failed', 'message': '识别失败'}
+
+        # 检查result.boxes是否存在且不为空
+        if not hasattr(result, 'boxes') or result.boxes is None or len(result.boxes) == 0:
+            return {'status': 'empty'}
+
+        # 处理识别结果
+        boxes = result.boxes
+        texts = result.txts
+        scores = result.scores
+
+        # 对文本进行排序（从左到右，从上到下）
+        with metrics.span('sort'):
             sorted_results = self._sort_text_by_position(boxes, texts, scores)
-            boxes, texts, scores = zip(*sorted_results) if sorted_results else ([], [], [])
-            
-            print(f"检测到 {len(boxes)} 个文本框:")
-            for i, (box, text, score) in enumerate(zip(boxes, texts, scores)):
-                # 确保文本正确编码
-                if isinstance(text, bytes):
-                    text = text.decode('utf-8', errors='ignore')
-                elif not isinstance(text, str):
-                    text = str(text)
-                
-                print(f"文本 {i+1}: {text} (置信度: {score:.3f})")
-            
-            # 在图像上绘制检测框
-            result_image = image.copy()
-            for box in boxes:
-                box = np.array(box, dtype=np.int32).reshape(-1, 1, 2)
-                cv2.polylines(result_image, [box], True, (0, 255, 0), 2)
-            
-            # 使用PIL绘制中文文本
-            result_image_with_text = self.draw_chinese_text(result_image, boxes, texts, scores)
-            
-            # 保存识别结果
-            self._save_recognition_result(result_image_with_text, texts, scores, boxes)
-            
-            self.win.statusBar().showMessage(f"识别完成，检测到 {len(boxes)} 个文本框")
-            
-        except Exception as e:
-            print(f"识别失败: {e}")
-            import traceback
-            traceback.print_exc()
-            self.win.statusBar().showMessage(f"识别失败: {str(e)}")
+        boxes, texts, scores = zip(*sorted_results) if sorted_results else ([], [], [])
+
+        print(f"检测到 {len(boxes)} 个文本框:")
+        for i, (box, text, score) in enumerate(zip(boxes, texts, scores)):
+            # 确保文本正确编码
+            if isinstance(text, bytes):
+                text = text.decode('utf-8', errors='ignore')
+            elif not isinstance(text, str):
+                text = str(text)
+
+            print(f"文本 {i+1}: {text} (置信度: {score:.3f})")
+
+        # 检测框映射回整帧坐标（用于界面叠加显示与入库）
+        ox, oy = roi_offset
+        frame_boxes = [(np.asarray(b, dtype=np.float32) + (ox, oy)).tolist() for b in boxes]
+
+        # 保存识别结果：原始 ROI + 标注数据，标注图按需重绘
+        saved = self._save_recognition_result(image if raw_image is None else raw_image, boxes, frame_boxes,
+                                              texts, scores, roi_offset, text_color, snapshot_cfg)
+        saved, combined_text, avg_confidence = saved
+
+        return {
+            'status': 'ok',
+            'saved': saved,
+            'text': combined_text,
+            'confidence': avg_confidence,
+            'count': len(boxes),
+            'boxes': frame_boxes,
+            'texts': list(texts),
+            'scores': [float(v) for v in scores],
+        }
 
     # ---------- settings & theme ----------
     def on_theme_changed(self, mode: str):
-        ui_cfg = self.cfg.setdefault('ui', {})
-        ui_cfg['theme'] = mode
-        save_config(self.cfg)
+        self.config_store.set('ui', 'theme', mode)
+        get_font_manager().invalidate_text_color()
         
         # 刷新ROI视图中的文字颜色
         if hasattr(self.win, 'view') and hasattr(self.win.view, 'refresh_text_colors'):
@@ -308,13 +309,16 @@ class AppController:
             return
         dev = self.win.current_device()
         self.camera = CameraWorker(dev, self.cfg['camera']['width'], self.cfg['camera']['height'])
-        self.camera.frameReady.connect(self.on_frame)
+        self.camera.frameAvailable.connect(self.on_frame)
         self.camera.error.connect(self.on_error)
         self.camera.stopped.connect(self.on_camera_stopped)
         self.camera.start()
         self.win.set_camera_running(True)
+        if self.cfg['camera'].get('auto_capture', False):
+            self._start_auto_capture()
 
     def stop_camera(self):
+        self._stop_auto_capture()
         if self.camera:
             self.camera.stop()
             self.camera = None
@@ -322,54 +326,238 @@ class AppController:
         self.win.clear_frame()
         self.win.show_placeholder('相机已关闭')
         self.win.set_camera_running(False)
+        # 不在界面线程等待快照写完：写入线程入库后经 rowsSaved 刷新列表，退出时 shutdown() 会写完剩余快照
+        pending = self.snapshot_writer.pending()
+        if pending:
+            self.win.statusBar().showMessage(f"相机已关闭，{pending} 条识别结果正在后台保存")
 
     def on_camera_stopped(self):
+        self._stop_auto_capture()
         self.current_frame = None
         self.win.clear_frame()
         self.win.show_placeholder('相机已关闭')
         self.win.set_camera_running(False)
 
-    def on_frame(self, frame):
-        self.current_frame = frame
-        
+    def on_frame(self, seq: int):
+        # 从信箱拉取最新帧；积压期间的旧帧已被相机线程覆盖
+        if self.camera is None:
+            return
+        packet = self.camera.mailbox.take()
+        if packet is None:
+            return
+        self.current_frame = packet.image
+        self.current_frame_seq = packet.seq
+        self.current_frame_ts = packet.timestamp
+
         # 直接显示普通帧（移除实时检测功能）
-        self.win.show_frame(frame)
+        t0 = time.perf_counter()
+        if self.win.show_frame(packet.image):
+            metrics.record('preview', (time.perf_counter() - t0) * 1000.0)
 
     # ---------- capture & ocr ----------
-    def capture_once(self):
+    def capture_once(self, auto: bool = False):
+        """提交一次识别任务，成功入队返回 True"""
         if self.current_frame is None:
+            return False
+        if self.ocr is None:
+            if self._ocr_warmup is not None:
+                self.win.statusBar().showMessage("OCR引擎加载中，请稍候")
+            else:
+                self.win.statusBar().showMessage("OCR未初始化")
+            return False
+        # 相机线程每次 read() 都会生成新的帧数组，之后不再修改，可直接交给 OCR 线程
+        job = self.ocr_worker.submit({
+            'frame': self.current_frame,
+            'frame_seq': self.current_frame_seq,
+            'captured_at': self.current_frame_ts,
+            'roi_norm': self.roi_norm,
+            'preprocess': dict(self.cfg.get('preprocess', {})),
+            'snapshot': snapshot_settings(self.cfg.get('snapshot')),
+            'text_color': self._get_text_color_for_pil(),
+        })
+        if job is None:
+            if not auto:
+                self.win.statusBar().showMessage("识别任务排队已满，本次拍照已忽略")
+            return False
+        if not auto:
+            self.win.statusBar().showMessage("正在识别...")
+        return True
+
+    def _process_job(self, payload):
+        """OCR 线程入口：ROI 裁剪、预处理、识别、绘制与保存"""
+        with metrics.span('job_total'):
+            # 仅对 ROI 区域做预处理与识别（零拷贝视图），检测框随后映射回整帧坐标
+            roi_frame, roi_offset = crop_roi(payload['frame'], payload.get('roi_norm'))
+            raw_roi = roi_frame
+
+            # 应用预处理（如果启用）
+            pp_cfg = payload.get('preprocess') or {}
+            if pp_cfg.get('enable_preprocess', True):
+                # 输出三通道：RapidOCR 收到单通道图像时自己会转回 BGR，这里用引擎的复用缓冲区完成转换
+                engine = get_preprocess_engine(pp_cfg)
+                with metrics.span('preprocess'):
+                    roi_frame = engine.process(roi_frame)
+                # 各步骤耗时分别记录（preprocess_gray、preprocess_denoise 等），便于对比降噪方法的开销
+                for step, ms in engine.last_timings.items():
+                    metrics.record(f'preprocess_{step}', ms)
+
+            return self._process_with_rapidocr(roi_frame, payload.get('text_color'), roi_offset,
+                                               raw_roi, payload.get('snapshot'))
+
+    def on_ocr_result(self, job, result):
+        """OCR 线程完成一次识别后在 GUI 线程中更新界面"""
+        self.auto_capture.record_completion()
+        self._record_job_latency(job)
+        if self._first_capture_pending:
+            # 首次识别耗时（提交到结果返回），用于观察预热效果
+            self._first_capture_pending = False
+            latency_ms = (time.perf_counter() - job.submitted_at) * 1000.0
+            print(f"首次识别耗时: {latency_ms:.0f} ms")
+            self.win.set_ocr_status('OCR就绪', f"{self.win.lbl_ocr_status.toolTip()}\n首次识别 {latency_ms:.0f} ms")
+        result = result or {}
+        status = result.get('status')
+        if status == 'empty':
+            self.win.statusBar().showMessage("未检测到文本")
+            return
+        if status != 'ok':
+            self.win.statusBar().showMessage(result.get('message') or "识别失败")
             return
-        frame = self.current_frame.copy()
-        roi_frame = self._get_roi_frame(frame)
-        
-        # 应用预处理（如果启用）
-        pp_cfg = self.cfg.get('preprocess', {})
-        if pp_cfg.get('enable_preprocess', True):
-            roi_frame = apply_preprocess(roi_frame, pp_cfg)
-        
-        self._process_with_rapidocr(roi_frame)
-
-
 
+        # 更新界面（列表在快照入库后由 on_snapshots_saved 刷新）
+        if self.camera is not None:
+            self.win.view.set_ocr_results(result.get('boxes'), result.get('texts'), result.get('scores'))
+
+        # 在界面上显示识别结果
+        self.win.set_result_detail(result.get('text', ''), float(result.get('confidence', 0.0)))
+        if result.get('saved', True):
+            self.win.statusBar().showMessage(f"识别完成，检测到 {result.get('count', 0)} 个文本框")
+        else:
+            self.win.statusBar().showMessage(f"识别完成，检测到 {result.get('count', 0)} 个文本框，但结果未保存（快照写入繁忙）")
+
+    def on_snapshots_saved(self, saved):
+        # 每次批量入库只刷新一次列表；浏览旧页面时不跳回，只更新计数
+        self._adjust_count(len(saved))
+        if self.current_page == 1:
+            self.load_latest()
+        else:
+            self._compute_counts()
+            self.win.set_page_label(self.current_page, self.total_pages, self.win.results.count(), self.total_count)
+            self._recalc_has_prev_next()
+            self._update_pager_buttons()
 
+    def on_retention_swept(self, stats):
+        print(f"快照清理: 删除 {stats['rows']} 条记录、{stats['files']} 个文件，"
+              f"释放 {stats['bytes'] / 1024 / 1024:.1f} MB，用时 {stats['elapsed_ms']:.0f} ms")
+        self._adjust_count(-stats['rows'])
+        self.load_latest()
 
-    def _save_recognition_result(self, result_image, texts, scores, boxes):
-        """保存识别结果"""
+    def on_snapshot_dropped(self, item):
+        print(f"快照写入队列已满，已丢弃: {item.path}")
+        self.win.statusBar().showMessage("快照写入队列已满，部分结果未保存")
+
+    def on_snapshot_failed(self, item, message: str):
+        self.win.statusBar().showMessage(f"保存识别结果失败: {message}")
+
+    def on_ocr_failed(self, job, message: str):
+        self.auto_capture.record_completion()
+        self._record_job_latency(job)
+        print(f"识别失败: {message}")
+        self.win.statusBar().showMessage(f"识别失败: {message}")
+
+    def on_ocr_dropped(self, job):
+        print(f"识别任务 #{job.job_id} 因队列已满被丢弃")
+        # 与失败时一样在状态栏提示，避免停留在“正在识别...”；仍有任务在执行时说明正在识别较新的画面
+        if self.ocr_worker.is_busy():
+            self.win.statusBar().showMessage("识别任务排队已满，较早的拍照已丢弃，正在识别较新的画面...")
+        else:
+            self.win.statusBar().showMessage("识别任务排队已满，本次拍照已丢弃")
+
+    def _record_job_latency(self, job):
+        """排队等待、拍照到出结果（帧龄）与提交到出结果的端到端耗时"""
+        now = time.perf_counter()
+        if job.started_at:
+            metrics.record('queue_wait', (job.started_at - job.submitted_at) * 1000.0)
+        metrics.record('end_to_end', (now - job.submitted_at) * 1000.0)
+        captured_at = (job.payload or {}).get('captured_at') if isinstance(job.payload, dict) else None
+        if captured_at:
+            metrics.record('frame_age', (time.monotonic() - captured_at) * 1000.0)
+
+    def _refresh_metrics_readout(self):
+        snap = metrics.snapshot()
+        if not snap:
+            return
+        parts = []
+        for name, label in (('ocr', 'OCR'), ('preprocess', '预处理'), ('end_to_end', '全程')):
+            s = snap.get(name)
+            if s:
+                parts.append(f"{label} {s['p50_ms']:.0f}/{s['p95_ms']:.0f}ms")
+        lines = [f"{'阶段':<12}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  (ms, 最近 {self.cfg.get('metrics', {}).get('window', 512)} 次)"]
+        for name in sorted(snap):
+            s = snap[name]
+            lines.append(f"{name:<12}{s['p50_ms']:>8.1f}{s['p95_ms']:>8.1f}{s['p99_ms']:>8.1f}{s['max_ms']:>8.1f}")
+        self.win.set_metrics_status('  '.join(parts), '<pre>' + '\n'.join(lines) + '</pre>')
+
+    def shutdown(self):
+        """应用退出前停止后台线程"""
+        self._metrics_timer.stop()
+        metrics.stop_dump()
+        self._stop_auto_capture()
+        if self.camera:
+            self.camera.stop()
+            self.camera = None
+        self.ocr_worker.stop()
+        # OCR 线程停止后不会再有新的快照，写完剩余队列再退出
+        self.snapshot_writer.stop()
+        if self.retention_worker is not None:
+            self.retention_worker.stop()
+        if self._ocr_warmup is not None:
+            # 会话创建无法中断，等待预热线程结束
+            self._ocr_warmup.wait()
+        # 写入尚未保存的配置变更
+        self._config_save_timer.stop()
+        self.config_store.flush()
+
+    def _schedule_config_save(self):
+        if not self._config_save_timer.isActive():
+            self._config_save_timer.start()
+
+
+    def _save_recognition_result(self, roi_image, boxes, frame_boxes, texts, scores,
+                                 roi_offset=(0, 0), text_color=None, snapshot_cfg=None):
+        """保存识别结果：在 OCR 线程中编码快照，文件写入与入库交给快照写入线程
+
+        快照只保存原始 ROI（按 snapshot 配置缩放/转灰度/编码），检测框、文本与置信度以
+        整帧坐标存入 det_boxes_json，ROI 位置与缩放存入 roi_json，查看结果图时据此重绘。
+        store_annotated 为真时另存一张标注图到 processed_image_path。
+
+        返回 (saved, combined_text, avg_confidence)；saved 为 False 表示结果未能交给写入线程
+        （队列已满超时或保存出错），记录不会入库。入库完成后由 rowsSaved 信号刷新列表。
+        """
+        combined_text = ' '.join(texts) if texts else ''
+        avg_confidence = sum(scores) / len(scores) if scores else 0.0
         try:
-            # 创建快照目录
             from ..core.config import get_user_data_path
-            snapshot_dir = get_user_data_path('snapshots')
-            os.makedirs(snapshot_dir, exist_ok=True)
-            
-            # 生成时间戳
-            ts = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-            result_path = os.path.join(snapshot_dir, f'result_{ts}.jpg')
-            
-            # 保存结果图像
-            cv2.imwrite(result_path, result_image)
-            
-            # 合并所有文本，验证排序是否正确
-            combined_text = ' '.join(texts) if texts else ''
+            snap_cfg = snapshot_settings(snapshot_cfg)
+            
+            # 生成时间戳；快照按日期分片存放，避免单个目录文件过多
+            now = datetime.now()
+            ts = now.strftime('%Y%m%d_%H%M%S_%f')
+            snapshot_dir = shard_dir(get_user_data_path('snapshots'), now)
+            
+            # 编码原始 ROI
+            with metrics.span('encode'):
+                ext, data, scale = encode_snapshot(roi_image, snap_cfg)
+            roi_path = os.path.join(snapshot_dir, f'{ROI_PREFIX}{ts}.{ext}')
+            files = [(roi_path, data)]
+
+            result_path = None
+            if snap_cfg.get('store_annotated'):
+                with metrics.span('draw'):
+                    annotated = render_annotations(roi_image, boxes, texts, scores, text_color or (0, 0, 0))
+                with metrics.span('encode'):
+                    ext, data, _ = encode_snapshot(annotated, snap_cfg)
+                result_path = os.path.join(snapshot_dir, f'{ANNOTATED_PREFIX}{ts}.{ext}')
+                files.append((result_path, data))
             
             # 验证文本排序是否符合要求格式
             expected_pattern = r'生产日期\s+\d{4}/\d{2}/\d{2}\s+CH\s+合格'
@@ -377,41 +565,48 @@ class AppController:
             if not re.search(expected_pattern, combined_text):
                 print(f"警告：识别结果可能不符合预期格式。当前结果: {combined_text}")
                 print(f"预期格式: 生产日期 YYYY/MM/DD CH 合格")
-            avg_confidence = sum(scores) / len(scores) if scores else 0.0
-            
-            # 转换检测框为JSON格式
-            try:
-                import numpy as np
-                det_boxes_json = json.dumps([np.asarray(b).tolist() for b in (boxes or [])], ensure_ascii=False)
-            except Exception:
-                det_boxes_json = '[]'
             
-            # 保存到数据库
-            rid = self.save_result(combined_text, avg_confidence, result_path, result_path, det_boxes_json)
-            
-            # 更新界面
-            self.load_latest()
-            
-            # 在界面上显示识别结果
-            self.win.set_result_detail(combined_text, avg_confidence)
-            
-            return rid
+            # 交给快照写入线程：写文件并批量入库
+            h, w = roi_image.shape[:2]
+            row = {
+                'image_path': roi_path,
+                'processed_image_path': result_path,
+                'date_text': combined_text,
+                'confidence': avg_confidence,
+                'det_boxes_json': dump_annotations(frame_boxes, texts, scores),
+                'roi_json': dump_roi(roi_offset, (w, h), scale),
+            }
+            if not self.snapshot_writer.submit(SnapshotWrite(files, row), timeout=10.0):
+                print(f"快照写入队列已满，结果未保存: {combined_text}")
+                return False, combined_text, avg_confidence
+
+            return True, combined_text, avg_confidence
             
         except Exception as e:
             print(f"保存识别结果失败: {e}")
-            return None
+            return False, combined_text, avg_confidence
     
-    def save_result(self, text: str, confidence: float, orig_path: str, proc_path: str, det_boxes_json: str = None):
-        from ..core.db import get_session, OcrResult
-        session = get_session()
-        try:
-            rec = OcrResult(image_path=orig_path, processed_image_path=proc_path, date_text=text,
-                            confidence=confidence, det_boxes_json=det_boxes_json)
-            session.add(rec)
-            session.commit()
-            return rec.id
-        finally:
-            session.close()
+    # ---------- auto capture ----------
+    def on_auto_capture_toggled(self, enabled: bool):
+        self.config_store.set('camera', 'auto_capture', bool(enabled))
+        if enabled and self.camera and self.camera.isRunning():
+            self._start_auto_capture()
+        elif not enabled:
+            self._stop_auto_capture()
+
+    def _start_auto_capture(self):
+        self.auto_capture.set_interval(int(self.cfg['camera'].get('capture_interval_ms', 1000)))
+        self.auto_capture.start()
+        self.win.set_auto_capture_status(f'自动拍照：0.00/{self.auto_capture.requested_rate():.2f} 次/秒')
+
+    def _stop_auto_capture(self):
+        self.auto_capture.stop()
+        self.win.set_auto_capture_status('')
+
+    def on_auto_capture_rate(self, achieved: float, requested: float):
+        self.win.set_auto_capture_status(
+            f'自动拍照：{achieved:.2f}/{requested:.2f} 次/秒（跳过 {self.auto_capture.skipped} 次）'
+        )
 
     # ---------- results list ----------
     def on_result_selected(self, rid: int):
@@ -433,11 +628,19 @@ class AppController:
             return
         session = get_session()
         path = None
+        annotations, roi = [], None
         try:
             row = session.query(OcrResult).filter(OcrResult.id == rid).first()
             if not row:
                 return
-            path = row.image_path if original else (row.processed_image_path or row.image_path)
+            path = row.image_path
+            if not original:
+                if row.processed_image_path and os.path.exists(row.processed_image_path):
+                    path = row.processed_image_path
+                else:
+                    # 未保存标注图：在原始 ROI 上叠加标注数据
+                    annotations = parse_annotations(row.det_boxes_json)
+                    roi = parse_roi(row.roi_json)
         finally:
             session.close()
         if not path or not os.path.exists(path):
@@ -445,11 +648,13 @@ class AppController:
         img = cv2.imread(path)
         if img is None:
             return
+        # 标注以矢量叠加层显示，不再绘制到图像中
+        boxes, texts, scores = annotations_to_snapshot(annotations, roi) if annotations else (None, None, None)
         h, w = img.shape[:2]
         qimg = QImage(img.data, w, h, w*3, QImage.Format_BGR888)
         dlg = ImageViewerDialog(self.win)
         dlg.resize(min(960, w), min(720, h))
-        dlg.setImage(qimg)
+        dlg.setImage(qimg, boxes, texts, scores)
         dlg.exec()
 
     def edit_result_text(self, rid: int):
@@ -469,20 +674,14 @@ class AppController:
             QMessageBox.critical(self.win, '更新失败', str(e))
         finally:
             session.close()
-        self.load_latest()
+        self._load_page(self.current_page)
 
     # ---------- roi ----------
     def on_roi_changed(self, roi_norm):
+        roi_norm = list(roi_norm) if roi_norm else None
         self.roi_norm = roi_norm
-        self.cfg['camera']['roi_norm'] = roi_norm
-        save_config(self.cfg)
-
-    def _get_roi_frame(self, frame):
-        # 不进行ROI裁剪，直接返回原始帧
-        return frame
-
-    def _extract_roi(self, frame):
-        return self._get_roi_frame(frame)
+        # 拖动 ROI 时每个鼠标事件都会触发，写库由 ConfigStore 合并
+        self.config_store.set('camera', 'roi_norm', roi_norm)
 
 
 
@@ -492,8 +691,9 @@ class AppController:
         from ..ui.preprocess_settings import PreprocessSettingsDialog
         dlg = PreprocessSettingsDialog(self.cfg, self.current_frame, self.win)
         if dlg.exec() == QDialog.Accepted:
-            # save and apply
-            save_config(self.cfg)
+            # save and apply（对话框原地修改了预处理与相机配置）
+            self.config_store.mark_dirty('preprocess')
+            self.config_store.mark_dirty('camera')
             # If resolution changed, restart camera to apply
             try:
                 cam_w = int(self.cfg['camera'].get('width', 1280))
@@ -519,31 +719,15 @@ class AppController:
 
     # ---------- preprocess toggle ----------
     def on_preprocess_toggled(self, enabled: bool):
-        pp = self.cfg.setdefault('preprocess', {})
-        pp['enable_preprocess'] = bool(enabled)
-        save_config(self.cfg)
+        self.config_store.set('preprocess', 'enable_preprocess', bool(enabled))
 
     # ---------- pagination ----------
+    # 键集分页：第 1 页为最新数据，第 n 页取 id < _page_bounds[n-1] 的记录。新记录只会进入第 1 页，
+    # 已浏览页面的边界不受插入影响。总条数缓存在 total_count，入库 / 删除时增量维护，
+    # 仅在缓存失效（None）时执行一次 COUNT。
     def load_latest(self):
-        session = get_session()
-        try:
-            size = int(self.page_size)
-            rows = session.query(OcrResult).order_by(OcrResult.id.desc()).limit(size).all()
-            simple = []
-            for r in rows:
-                ts = r.created_at.strftime('%Y-%m-%d %H:%M:%S') if getattr(r, 'created_at', None) else ''
-                simple.append((r.id, r.date_text or '', float(r.confidence or 0.0), r.image_path, r.processed_image_path, ts))
-            self.win.set_results(simple)
-            if rows:
-                self.loaded_until_id = rows[-1].id
-                self._page_anchor_id = rows[0].id
-            else:
-                self.loaded_until_id = None
-                self._page_anchor_id = None
-        finally:
-            session.close()
-        self._recalc_has_prev_next()
-        self._update_pager_buttons()
+        self._page_bounds = [None]
+        self._load_page(1)
 
     def on_load_more(self):
         # No-op: list scrolling pagination disabled; we use page toolbar
@@ -551,25 +735,24 @@ class AppController:
 
     def _recalc_has_prev_next(self):
         self._has_prev = bool(self.current_page > 1)
-        self._has_next = bool(self.current_page < max(1, self.total_pages))
+        self._has_next = bool(self.current_page < max(1, self.total_pages)
+                              and len(self._page_bounds) > self.current_page)
 
     def _update_pager_buttons(self):
         if hasattr(self.win, 'set_pager'):
             self.win.set_pager(self._has_prev, self._has_next)
 
     def go_next_page(self):
-        # 下一页：向更新方向移动（页码 +1），最后一页为最新数据
-        if self.current_page >= self.total_pages:
+        # 下一页：向更旧方向移动（页码 +1）
+        if not self._has_next:
             return
-        self.current_page += 1
-        self._load_page(self.current_page)
+        self._load_page(self.current_page + 1)
 
     def go_prev_page(self):
-        # 上一页：向更旧方向移动（页码 -1）
+        # 上一页：向更新方向移动（页码 -1）
         if self.current_page <= 1:
             return
-        self.current_page -= 1
-        self._load_page(self.current_page)
+        self._load_page(self.current_page - 1)
 
     # ---------- viewport page size ----------
     def on_page_size_changed(self, size: int):
@@ -582,59 +765,43 @@ class AppController:
         if new_size == self.page_size:
             return
         self.page_size = new_size
-        # Recalculate total pages; default回到最新页（最后一页）
+        # 页边界随每页条数变化，回到最新页
         self.load_latest()
 
     # ---------- page-based loading ----------
     def _compute_counts(self):
-        session = get_session()
-        try:
-            self.total_count = int(session.query(OcrResult).count())
-            self.total_pages = int(max(1, math.ceil(self.total_count / float(self.page_size or 1))))
-        finally:
-            session.close()
+        if self.total_count is None:
+            self.total_count = count_ocr_results()
+        self.total_pages = int(max(1, math.ceil(self.total_count / float(self.page_size or 1))))
+
+    def _adjust_count(self, delta: int):
+        if self.total_count is not None:
+            self.total_count = max(0, self.total_count + int(delta))
 
     def _load_page(self, page: int):
         self._compute_counts()
-        if self.total_count == 0:
-            self.current_page = 1
-            self.total_pages = 1
-            self.win.set_results([])
-            if hasattr(self.win, 'set_page_label'):
-                self.win.set_page_label(1, 1, 0, 0)
-            self._recalc_has_prev_next()
-            self._update_pager_buttons()
+        page = max(1, min(int(page), len(self._page_bounds)))
+        rows = fetch_result_page(self._page_bounds[page - 1], int(self.page_size))
+        if not rows and page > 1:
+            # 该页记录已被删除（例如保留策略清理），重新计数并回到最新页
+            self.total_count = None
+            self.load_latest()
             return
-        # Clamp page within range
-        page = max(1, min(int(page), int(self.total_pages)))
+        # 记录下一页的边界，丢弃更旧页面的过期边界
+        del self._page_bounds[page:]
+        if len(rows) >= int(self.page_size):
+            self._page_bounds.append(rows[-1][0])
         self.current_page = page
-        offset = (page - 1) * int(self.page_size)
-        session = get_session()
-        try:
-            rows = (session.query(OcrResult)
-                    .order_by(OcrResult.id.desc())
-                    .offset(offset)
-                    .limit(int(self.page_size))
-                    .all())
-            # Build tuples and reverse within page to show descending (newest first)
-            simple = []
-            for r in rows:
-                ts = r.created_at.strftime('%Y-%m-%d %H:%M:%S') if getattr(r, 'created_at', None) else ''
-                simple.append((r.id, r.date_text or '', float(r.confidence or 0.0), r.image_path, r.processed_image_path, ts))
-            self.win.set_results(simple)
-            if hasattr(self.win, 'set_page_label'):
-                self.win.set_page_label(self.current_page, self.total_pages, len(simple), self.total_count)
-        finally:
-            session.close()
+        simple = []
+        for rid, text, conf, img_path, proc_path, created_at in rows:
+            ts = created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else ''
+            simple.append((rid, text or '', float(conf or 0.0), img_path, proc_path, ts))
+        self.win.set_results(simple)
+        if hasattr(self.win, 'set_page_label'):
+            self.win.set_page_label(self.current_page, self.total_pages, len(simple), self.total_count)
         self._recalc_has_prev_next()
         self._update_pager_buttons()
 
-    def load_latest(self):
-        # Default to page 1 which contains the latest data in descending order
-        self._compute_counts()
-        self.current_page = 1
-        self._load_page(self.current_page)
-
     def clear_all_data(self):
         """清空所有图片和列表数据"""
         try:
@@ -659,6 +826,8 @@ class AppController:
                 self.current_page = 1
                 self.total_pages = 1
                 self.total_count = 0
+                self._page_bounds = [None]
+                self._recalc_has_prev_next()
                 self._update_pager_buttons()
                 
                 # 显示成功消息
@@ -687,9 +856,10 @@ class AppController:
                     if result:
                         session.delete(result)
                         session.commit()
+                        self._adjust_count(-1)
                         
                         # 重新加载当前页面
-                        self.load_latest()
+                        self._load_page(self.current_page)
                         
                         # 显示成功消息
                         self.win.statusBar().showMessage('数据已删除')
@@ -793,45 +963,7 @@ class AppController:
 
     def _sort_text_by_position(self, boxes, texts, scores):
         """根据文本内容和位置对文本进行智能排序，确保正确的语义顺序"""
-        if len(boxes) == 0 or len(texts) == 0:
-            return []
-        
-        # 创建包含位置信息和文本内容的元组列表
-        text_items = []
-        for box, text, score in zip(boxes, texts, scores):
-            # 确保文本正确编码
-            if isinstance(text, bytes):
-                text = text.decode('utf-8', errors='ignore')
-            elif not isinstance(text, str):
-                text = str(text)
-            
-            # 计算文本框的中心点
-            if len(box) >= 4:
-                x_coords = [point[0] for point in box]
-                y_coords = [point[1] for point in box]
-                center_x = sum(x_coords) / len(x_coords)
-                center_y = sum(y_coords) / len(y_coords)
-                text_items.append((center_x, center_y, box, text, score))
-        
-        # 定义期望的文本顺序和优先级
-        def get_text_priority(text):
-            text = text.strip()
-            if '生产日期' in text:
-                return 1
-            elif '/' in text and len(text.split('/')) == 3:  # 日期格式 YYYY/MM/DD
-                return 2
-            elif text == 'CH':
-                return 3
-            elif '合格' in text:
-                return 4
-            else:
-                return 5  # 其他文本
-        
-        # 首先按照文本内容的语义优先级排序，然后按位置排序
-        text_items.sort(key=lambda item: (get_text_priority(item[3]), item[1], item[0]))
-        
-        # 返回排序后的结果
-        return [(item[2], item[3], item[4]) for item in text_items]
+        return sort_text_by_position(boxes, texts, scores)
 
     # ---------- global error handling ----------
     def on_error(self, message: str):
@@ -2,7 +2,8 @@ from __future__ import annotations
 import json
 import os
 import sys
-from typing import Tuple
+import threading
+from typing import Any, Callable, List, Optional, Set, Tuple
 from .db import get_session, AppConfig
 
 
@@ -47,12 +48,16 @@ def get_user_data_path(relative_path=''):
     return user_data_dir
 
 
+# 配置结构版本，load_config 据此迁移旧版本保存的配置
+CONFIG_VERSION = 1
+
 DEFAULT_CONFIG = {
+    'config_version': CONFIG_VERSION,
     'camera': {
         'device_index': 0,
         'width': 1280,
         'height': 720,
-        'auto_capture': True,
+        'auto_capture': False,  # 相机启动后按 capture_interval_ms 连续拍照识别，需在菜单中开启
         'capture_interval_ms': 1000,
         'roi_norm': None
     },
@@ -64,21 +69,60 @@ DEFAULT_CONFIG = {
         'dict_path': get_resource_path('lib/models/dict_custom_chinese_date.txt'),
         'vis_out_dir': get_user_data_path('out'),
         'rec_img_shape': [3, 48, 320],
+        'rec_batch_size': 6,
         'det_box_thresh': 0.3,
         'det_thresh': 0.1,
         'det_unclip_ratio': 2.0,
         'fallback_threshold': 0.95
     },
+    'ocr_worker': {
+        'queue_size': 2,                   # 待识别任务队列上限
+        'overflow_policy': 'drop_oldest',  # 'drop_oldest' | 'reject_new'
+    },
+    'snapshot': {
+        'format': 'jpg',           # 'jpg' | 'webp' | 'png'
+        'jpeg_quality': 90,
+        'webp_quality': 80,
+        'png_compression': 3,
+        'max_dimension': 0,        # 快照长边上限（像素），0 表示原尺寸
+        'grayscale': False,
+        'store_annotated': False,  # 另存带标注的结果图；默认只存原始 ROI，查看时重绘标注
+    },
+    'retention': {
+        'enabled': False,          # 默认关闭：清理会永久删除识别记录与快照
+        'max_age_days': 0,         # 保留天数，0 表示不按时间清理
+        'max_count': 0,            # 最多保留的识别记录数，0 表示不限
+        'max_bytes_mb': 0,         # 快照目录总大小上限（MB），0 表示不限
+        'sweep_interval_sec': 600,
+        'batch_size': 200,
+        'batch_pause_ms': 50,
+    },
+    'snapshot_writer': {
+        'queue_size': 32,             # 待写入快照队列上限
+        'overflow_policy': 'block',   # 'block'（识别线程等待） | 'drop_oldest' | 'reject_new'
+    },
+    'persistence': {
+        'batch_size': 50,             # 每个事务最多提交的记录数
+        'commit_interval_ms': 100,    # 缓冲中最早一条记录的最长等待时间，到时即提交（崩溃时最多丢失这段时间的记录）
+    },
+    'metrics': {
+        'enabled': True,
+        'window': 512,             # 每个阶段保留的最近样本数
+        'dump_interval_sec': 60,   # 定期写入 app_data/metrics.jsonl 的间隔，0 表示不写
+    },
     'ui': {
         'theme': 'auto',   # 'auto' | 'light' | 'dark'
-        'accent': '#0078d7'
+        'accent': '#0078d7',
+        'preview_max_fps': 15,  # 预览最大显示帧率，0 表示不限制
     },
     'preprocess': {
         'enable_preprocess': True,
         'convert_to_gray': True,
         'brightness': 1.0,
         'contrast': 1.0,
-        'denoising_enabled': True
+        'denoising_enabled': True,
+        'denoise_method': 'bilateral',  # 'median' | 'gaussian' | 'bilateral' | 'nlmeans_downscaled' | 'nlmeans'
+        'denoise_scale': 0.5,           # nlmeans_downscaled 的缩放比例
     },
 }
 
@@ -96,11 +140,25 @@ def load_config():
         cfg.setdefault('onnx_ocr', DEFAULT_CONFIG['onnx_ocr'])
         cfg.setdefault('ui', DEFAULT_CONFIG['ui'])
         cfg.setdefault('preprocess', DEFAULT_CONFIG['preprocess'])
+        cfg.setdefault('ocr_worker', DEFAULT_CONFIG['ocr_worker'])
+        cfg.setdefault('metrics', DEFAULT_CONFIG['metrics'])
+        cfg.setdefault('snapshot_writer', DEFAULT_CONFIG['snapshot_writer'])
+        cfg.setdefault('snapshot', DEFAULT_CONFIG['snapshot'])
+        cfg.setdefault('retention', DEFAULT_CONFIG['retention'])
+        cfg.setdefault('persistence', DEFAULT_CONFIG['persistence'])
+        _migrate_config(cfg)
         return cfg
     finally:
         session.close()
 
 
+def _migrate_config(cfg: dict):
+    if int(cfg.get('config_version') or 0) < 1:
+        # 旧版本默认保存了 auto_capture: True，但当时该项未生效；连续拍照改为需用户在菜单中开启
+        cfg['camera']['auto_capture'] = False
+    cfg['config_version'] = CONFIG_VERSION
+
+
 def save_config(cfg: dict):
     session = get_session()
     try:
@@ -117,3 +175,110 @@ def save_config(cfg: dict):
         session.close()
 
 
+class ConfigStore:
+    """内存中的配置：读写只访问内存中的 dict，写库合并后延迟执行
+
+    set() 修改一项并通知订阅者；对 data 的原地修改（例如设置对话框）需随后调用 mark_dirty()。
+    首次变更后最多等待 save_delay_ms 写一次库，期间的所有变更合并为一次写入（拖动 ROI 时
+    不会每个鼠标事件都提交一次）；退出前调用 flush() 立即写入。
+
+    延迟写库默认由 threading.Timer 触发。界面程序中 data 会在界面线程原地修改，应传入
+    schedule_save（例如启动单次 QTimer 的函数，到时调用 flush()），让序列化与写库也在界面线程执行。
+    写库失败时变更保留在内存中，并重新安排一次写库。
+    """
+
+    def __init__(self, cfg: Optional[dict] = None, save_delay_ms: int = 500,
+                 saver: Callable[[dict], None] = None, schedule_save: Optional[Callable[[], None]] = None):
+        self.data = cfg if cfg is not None else load_config()
+        self.save_delay = max(0, int(save_delay_ms)) / 1000.0
+        self._saver = saver or save_config
+        self._schedule_save = schedule_save
+        self._lock = threading.RLock()
+        self._dirty: Set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._save_pending = False  # 已安排延迟写库、尚未执行
+        self._listeners: List[Callable[[str, Optional[str], Any], None]] = []
+        self.saves = 0
+
+    def get(self, section: str, key: Optional[str] = None, default=None):
+        with self._lock:
+            sec = self.data.get(section)
+            if key is None:
+                return default if sec is None else sec
+            return (sec or {}).get(key, default)
+
+    def set(self, section: str, key: str, value) -> bool:
+        """修改一项配置，值未变化时返回 False（不通知、不写库）"""
+        with self._lock:
+            sec = self.data.setdefault(section, {})
+            if key in sec and sec[key] == value:
+                return False
+            sec[key] = value
+            self._mark_dirty_locked(f'{section}.{key}')
+        self._notify(section, key, value)
+        return True
+
+    def mark_dirty(self, section: str, key: Optional[str] = None):
+        with self._lock:
+            self._mark_dirty_locked(section if key is None else f'{section}.{key}')
+        self._notify(section, key, self.get(section, key))
+
+    def subscribe(self, callback: Callable[[str, Optional[str], Any], None]):
+        """订阅配置变更，callback(section, key, value) 在修改方所在线程中调用"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @property
+    def dirty_keys(self) -> Set[str]:
+        with self._lock:
+            return set(self._dirty)
+
+    def _mark_dirty_locked(self, name: str):
+        self._dirty.add(name)
+        self._schedule_locked()
+
+    def _schedule_locked(self):
+        """有未保存的变更且尚未安排写库时安排一次（写库失败后也经此重试）"""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        if self._schedule_save is not None:
+            self._schedule_save()
+        else:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _notify(self, section, key, value):
+        for callback in list(self._listeners):
+            try:
+                callback(section, key, value)
+            except Exception as e:
+                print(f"配置变更回调失败: {e}")
+
+    def flush(self) -> bool:
+        """立即写入未保存的变更，没有变更时返回 False"""
+        with self._lock:
+            self._save_pending = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return False
+            dirty = self._dirty
+            self._dirty = set()
+        try:
+            with self._lock:
+                payload = json.loads(json.dumps(self.data, ensure_ascii=False))
+            self._saver(payload)
+        except Exception as e:
+            print(f"保存配置失败: {e}")
+            with self._lock:
+                self._dirty |= dirty
+                self._schedule_locked()
+            return False
+        self.saves += 1
+        return True
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import os
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, event, func, inspect, Column, Integer, String, Float, DateTime, Text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 
@@ -10,7 +10,33 @@ DATA_DIR = os.path.join(PROJECT_ROOT, 'app_data')
 os.makedirs(DATA_DIR, exist_ok=True)
 DB_PATH = os.path.join(DATA_DIR, 'ocr_results.sqlite3')
 
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False, future=True)
+# 连接级 PRAGMA：WAL 允许快照写入线程提交时界面线程照常读取；WAL 下 synchronous=NORMAL
+# 只在提交时不再逐次 fsync，断电可能丢失最近几次提交但不会损坏数据库；cache_size 为负值时单位为 KiB
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_sqlite_pragmas(target_engine, pragmas=None):
+    """为 engine 的每个新连接设置 PRAGMA（默认 SQLITE_PRAGMAS）"""
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(target_engine, 'connect')
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    return target_engine
+
+
+engine = apply_sqlite_pragmas(create_engine(f'sqlite:///{DB_PATH}', echo=False, future=True))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
@@ -20,10 +46,11 @@ class OcrResult(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     image_path = Column(String(512), nullable=False)
     processed_image_path = Column(String(512), nullable=True)
-    date_text = Column(String(128), nullable=True)
-    confidence = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    det_boxes_json = Column(Text, nullable=True)
+    date_text = Column(String(128), nullable=True, index=True)
+    confidence = Column(Float, default=0.0, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    det_boxes_json = Column(Text, nullable=True)  # [{box, text, score}, ...]，整帧坐标
+    roi_json = Column(Text, nullable=True)        # 快照在整帧中的 offset/size/scale
 
 
 class AppConfig(Base):
@@ -32,11 +59,74 @@ class AppConfig(Base):
     value = Column(Text, nullable=False)
 
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+# ---------- 结构迁移 ----------
+# 数据库版本保存在 PRAGMA user_version 中；MIGRATIONS[i] 把版本 i 升级到 i + 1。
+# 新建的数据库由 create_all 直接建成最新结构并标记为 SCHEMA_VERSION，迁移需保持幂等。
+def _migrate_add_roi_json(conn):
+    existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(ocr_results)")}
+    if 'roi_json' not in existing:
+        conn.exec_driver_sql("ALTER TABLE ocr_results ADD COLUMN roi_json TEXT")
+
+
+def _migrate_add_indexes(conn):
+    for column in ('created_at', 'confidence', 'date_text'):
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_ocr_results_{column} ON ocr_results ({column})")
+
+
+MIGRATIONS = (
+    _migrate_add_roi_json,
+    _migrate_add_indexes,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(target_engine=None) -> int:
+    """把数据库升级到 SCHEMA_VERSION，每个迁移在独立事务中执行，返回升级前的版本"""
+    target_engine = target_engine or engine
+    with target_engine.connect() as conn:
+        version = int(conn.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+    for step in range(version, SCHEMA_VERSION):
+        with target_engine.begin() as conn:
+            MIGRATIONS[step](conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {step + 1}")
+        print(f"数据库结构已升级到版本 {step + 1}")
+    return version
+
+
+def init_db(target_engine=None):
+    target_engine = target_engine or engine
+    fresh = not inspect(target_engine).has_table(OcrResult.__tablename__)
+    Base.metadata.create_all(bind=target_engine)
+    if fresh:
+        # 新库已是最新结构，直接标记版本，迁移只用于已有的旧库
+        with target_engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    migrate(target_engine)
 
 
 def get_session():
     return SessionLocal()
 
 
+def count_ocr_results(session_factory=None) -> int:
+    session = (session_factory or SessionLocal)()
+    try:
+        return int(session.query(func.count(OcrResult.id)).scalar() or 0)
+    finally:
+        session.close()
+
+
+def fetch_result_page(before_id=None, limit: int = 20, session_factory=None):
+    """按 id 倒序取一页结果列表（键集分页：只取 id < before_id 的记录，走主键索引）
+
+    只查询列表需要的列，返回 [(id, date_text, confidence, image_path, processed_image_path, created_at), ...]
+    """
+    session = (session_factory or SessionLocal)()
+    try:
+        q = session.query(OcrResult.id, OcrResult.date_text, OcrResult.confidence,
+                          OcrResult.image_path, OcrResult.processed_image_path, OcrResult.created_at)
+        if before_id is not None:
+            q = q.filter(OcrResult.id < before_id)
+        return [tuple(r) for r in q.order_by(OcrResult.id.desc()).limit(int(limit)).all()]
+    finally:
+        session.close()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class RollingHistogram:
+    """保留最近 maxlen 个样本（毫秒）的滚动统计"""
+
+    def __init__(self, maxlen: int = 512):
+        self._samples: deque[float] = deque(maxlen=max(1, int(maxlen)))
+        self.total_count = 0
+
+    def add(self, value_ms: float):
+        self._samples.append(float(value_ms))
+        self.total_count += 1
+
+    def snapshot(self) -> Optional[Dict[str, float]]:
+        if not self._samples:
+            return None
+        arr = np.fromiter(self._samples, dtype=np.float64, count=len(self._samples))
+        p50, p95, p99 = np.percentile(arr, (50, 95, 99))
+        return {
+            'n': int(arr.size),
+            'total': self.total_count,
+            'mean_ms': float(arr.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(arr.max()),
+        }
+
+
+class MetricsRegistry:
+    """各阶段耗时的进程内汇总，线程安全
+
+    在任意线程中用 span(name) 包裹一个阶段，或直接 record(name, ms)；
+    snapshot() 返回各阶段的滚动统计，start_dump() 在后台线程中定期把快照追加到 JSONL 文件。
+
+    应用记录的阶段：camera_retrieve、preview、queue_wait、preprocess（及各步骤 preprocess_<步骤>）、
+    ocr、sort、draw、encode、snapshot_write、db_flush、job_total、end_to_end、frame_age。
+    """
+
+    def __init__(self, window: int = 512):
+        self._window = window
+        self._hists: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+        self.enabled = True
+        self._dump_thread: Optional[threading.Thread] = None
+        self._dump_stop = threading.Event()
+        self._dump_path = ''
+
+    def configure(self, enabled: bool = True, window: int = 512):
+        with self._lock:
+            self.enabled = bool(enabled)
+            if int(window) != self._window:
+                self._window = int(window)
+                self._hists.clear()
+
+    def record(self, name: str, value_ms: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = RollingHistogram(self._window)
+            hist.add(value_ms)
+
+    @contextmanager
+    def span(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            items = list(self._hists.items())
+            # 在锁内复制样本，统计计算放到锁外
+            copies = {}
+            for name, hist in items:
+                h = RollingHistogram(self._window)
+                h._samples.extend(hist._samples)
+                h.total_count = hist.total_count
+                copies[name] = h
+        return {name: snap for name, snap in ((n, h.snapshot()) for n, h in copies.items()) if snap}
+
+    def reset(self):
+        with self._lock:
+            self._hists.clear()
+
+    # ---------- 定期落盘 ----------
+    def dump(self, path: str, max_bytes: int = 5 * 1024 * 1024):
+        """把当前快照追加为一行 JSON；文件超过 max_bytes 时轮换为 .1"""
+        snap = self.snapshot()
+        if not snap:
+            return
+        line = json.dumps({'time': datetime.now().isoformat(timespec='seconds'), 'stages': snap},
+                          ensure_ascii=False)
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+                os.replace(path, path + '.1')
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        except OSError as e:
+            print(f"写入性能指标失败: {e}")
+
+    def start_dump(self, path: str, interval_sec: float = 60.0):
+        """启动后台线程，每 interval_sec 秒写一次快照（文件 I/O 不占用界面线程）"""
+        self.stop_dump(final=False)
+        self._dump_path = path
+        self._dump_stop.clear()
+
+        def _loop():
+            while not self._dump_stop.wait(max(1.0, float(interval_sec))):
+                self.dump(path)
+
+        self._dump_thread = threading.Thread(target=_loop, name='metrics-dump', daemon=True)
+        self._dump_thread.start()
+
+    def stop_dump(self, final: bool = True):
+        thread = self._dump_thread
+        if thread is None:
+            return
+        self._dump_stop.set()
+        thread.join(timeout=2.0)
+        self._dump_thread = None
+        if final and self._dump_path:
+            self.dump(self._dump_path)
+
+
+metrics = MetricsRegistry()
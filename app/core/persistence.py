@@ -0,0 +1,157 @@
+"""识别结果批量入库
+
+save_many() 用 Core 在一个事务中插入多条 ocr_results 记录（SQLite ≥ 3.35 时为 executemany + RETURNING，
+更早的版本逐条插入），不构造 ORM 对象；
+ResultStore 在其上加一层缓冲，攒够 batch_size 条或距第一条缓冲记录超过 commit_interval_ms
+时提交一次，把每帧一次的提交（及其同步开销）摊到整批记录上。
+
+持久性说明：
+- 记录在 save_many() / ResultStore.flush() 返回后即已提交；缓冲中尚未提交的记录在进程崩溃时丢失，
+  最多丢失 batch_size 条或 commit_interval_ms 内的记录。
+- 数据库使用 WAL + synchronous=NORMAL（见 db.SQLITE_PRAGMAS）：进程崩溃不会丢失已提交的事务；
+  操作系统崩溃或断电时可能丢失最近几次提交，但数据库不会损坏。
+- 快照文件先于对应记录写入，崩溃后可能留下没有记录的孤立文件，不会出现指向缺失文件的记录
+  （保留策略清理时会一并处理旧文件）。
+"""
+from __future__ import annotations
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, insert, select, update
+
+from .db import engine as default_engine, OcrResult
+
+
+RESULT_COLUMNS = ('image_path', 'processed_image_path', 'date_text', 'confidence',
+                  'created_at', 'det_boxes_json', 'roi_json')
+
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, Any]:
+    # executemany 要求每条参数的键一致；Python 端默认值在此补齐
+    values = {name: row.get(name) for name in RESULT_COLUMNS}
+    if values['created_at'] is None:
+        values['created_at'] = datetime.utcnow()
+    if values['confidence'] is None:
+        values['confidence'] = 0.0
+    return values
+
+
+def save_many(rows: Iterable[Dict[str, Any]], target_engine=None) -> List[int]:
+    """在一个事务中插入多条识别记录（字段同 OcrResult），按输入顺序返回新记录 id
+
+    数据库支持 executemany + RETURNING（SQLite ≥ 3.35）时一次批量插入，否则在同一事务中逐条插入。
+    """
+    params = [_normalize(row) for row in rows]
+    if not params:
+        return []
+    target_engine = target_engine or default_engine
+    table = OcrResult.__table__
+    dialect = target_engine.dialect
+    with target_engine.begin() as conn:
+        if (getattr(dialect, 'insert_executemany_returning', False)
+                and getattr(dialect, 'insert_executemany_returning_sort_by_parameter_order', False)):
+            stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            return [row[0] for row in conn.execute(stmt, params)]
+        # SQLite < 3.35 不支持 RETURNING：同一事务中逐条插入，按 lastrowid 取 id
+        stmt = insert(table)
+        return [conn.execute(stmt, values).inserted_primary_key[0] for values in params]
+
+
+def existing_image_paths(paths: Iterable[str], target_engine=None, chunk: int = 500) -> Dict[str, Optional[str]]:
+    """返回 paths 中已存在 ocr_results 记录的 {image_path: roi_json}"""
+    paths = list(paths)
+    table = OcrResult.__table__
+    found: Dict[str, Optional[str]] = {}
+    with (target_engine or default_engine).connect() as conn:
+        # 分段查询，避免超过 SQLite 的参数个数上限
+        for i in range(0, len(paths), chunk):
+            stmt = (select(table.c.image_path, table.c.roi_json)
+                    .where(table.c.image_path.in_(paths[i:i + chunk])))
+            found.update((path, roi_json) for path, roi_json in conn.execute(stmt))
+    return found
+
+
+def update_by_image_path(rows: Iterable[Dict[str, Any]], target_engine=None) -> int:
+    """按 image_path 在一个事务中更新已有记录的识别结果（文本、置信度、标注），返回更新的记录数
+
+    roi_json 等其他列保持不变，det_boxes_json 须与原记录的 roi_json 使用同一坐标系。
+    """
+    params = [{'b_image_path': row['image_path'],
+               'date_text': row.get('date_text'),
+               'confidence': float(row.get('confidence') or 0.0),
+               'det_boxes_json': row.get('det_boxes_json')} for row in rows]
+    if not params:
+        return 0
+    table = OcrResult.__table__
+    stmt = update(table).where(table.c.image_path == bindparam('b_image_path'))
+    with (target_engine or default_engine).begin() as conn:
+        return conn.execute(stmt, params).rowcount
+
+
+class ResultStore:
+    """带缓冲的批量入库，线程安全
+
+    add() 把记录放入缓冲区，达到 batch_size 条或距第一条缓冲记录超过 commit_interval_ms 时
+    自动提交，返回本次提交的 id 列表（未提交时为空列表）；退出前调用 flush() 或 close()。
+    """
+
+    def __init__(self, batch_size: int = 50, commit_interval_ms: int = 100, target_engine=None):
+        self.batch_size = max(1, int(batch_size))
+        self.commit_interval = max(0, int(commit_interval_ms)) / 1000.0
+        self._engine = target_engine
+        self._pending: List[Dict[str, Any]] = []
+        self._first_pending_at = 0.0
+        self._lock = threading.Lock()
+        self.committed = 0
+        self.commits = 0
+
+    def add(self, row: Dict[str, Any]) -> List[int]:
+        with self._lock:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.append(row)
+            if self._due():
+                return self._flush_locked()
+        return []
+
+    def due(self) -> bool:
+        """缓冲区是否已到提交条件（供定时器轮询，避免低速写入时记录长时间停留在缓冲区）"""
+        with self._lock:
+            return bool(self._pending) and self._due()
+
+    def _due(self) -> bool:
+        return (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._first_pending_at >= self.commit_interval)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> List[int]:
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> List[int]:
+        if not self._pending:
+            return []
+        rows, self._pending = self._pending, []
+        try:
+            ids = save_many(rows, self._engine)
+        except Exception:
+            # 提交失败时放回缓冲区，由调用方决定重试或放弃
+            self._pending[:0] = rows
+            raise
+        self.committed += len(ids)
+        self.commits += 1
+        return ids
+
+    def close(self) -> List[int]:
+        return self.flush()
+
+
+def result_store_from_config(cfg: Optional[dict], target_engine=None) -> ResultStore:
+    persist_cfg = (cfg or {}).get('persistence', {}) or {}
+    return ResultStore(int(persist_cfg.get('batch_size', 50)), int(persist_cfg.get('commit_interval_ms', 100)),
+                       target_engine)
@@ -1,20 +1,32 @@
 from __future__ import annotations
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
 import cv2
 import numpy as np
 
 
-def _maybe_to_gray(img, cfg):
-    if cfg.get('convert_to_gray', True):
-        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    return img
-
-
-def _apply_brightness_contrast(img, cfg):
+def _brightness_contrast(cfg) -> Tuple[float, float]:
     brightness = float(cfg.get('亮度因子', cfg.get('brightness', 1.0)))
     contrast = float(cfg.get('对比度因子', cfg.get('contrast', 1.0)))
-    if brightness != 1.0 or contrast != 1.0:
-        return cv2.convertScaleAbs(img, alpha=contrast, beta=(brightness - 1.0) * 128)
-    return img
+    return brightness, contrast
+
+
+def _denoise_enabled(cfg) -> bool:
+    return bool(cfg.get('去噪', cfg.get('denoising_enabled', False)))
+
+
+# 去噪策略：耗时从低到高。nlmeans 效果最好但在 1280x720 上需要上百毫秒，
+# nlmeans_downscaled 在缩小后的副本上运行 NL-means 再放大回原尺寸。
+DENOISE_METHODS = ('median', 'gaussian', 'bilateral', 'nlmeans_downscaled', 'nlmeans')
+DEFAULT_DENOISE_METHOD = 'bilateral'
+
+
+def _denoise_method(cfg) -> str:
+    method = str(cfg.get('去噪方法', cfg.get('denoise_method', DEFAULT_DENOISE_METHOD)))
+    return method if method in DENOISE_METHODS else DEFAULT_DENOISE_METHOD
 
 
 # def _apply_binarization(img_gray, cfg):
@@ -53,12 +65,6 @@ def _apply_brightness_contrast(img, cfg):
 #     return img_gray
 
 
-def _apply_denoise(img_gray, cfg):
-    if not bool(cfg.get('去噪', cfg.get('denoising_enabled', False))):
-        return img_gray
-    return cv2.fastNlMeansDenoising(img_gray, None, 10, 7, 21)
-
-
 # def _apply_resize(img, cfg):
 #     if not bool(cfg.get('调整大小', cfg.get('resize_enabled', False))):
 #         return img
@@ -118,20 +124,159 @@ def _apply_denoise(img_gray, cfg):
 #     return img[y1:y2, x1:x2].copy()
 
 
-def apply_preprocess(frame, cfg: dict):
-    cfg = cfg or {}
-    img = frame.copy()
-    
-    # Apply brightness/contrast adjustment
-    img = _apply_brightness_contrast(img, cfg)
-    
-    # Convert to gray if needed
-    gray = _maybe_to_gray(img, cfg)
-    
-    # Apply denoising if enabled
-    gray = _apply_denoise(gray, cfg)
-    
-    # Convert back to BGR for display
-    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+def roi_rect(shape, roi_norm, min_size: int = 8):
+    """将归一化 ROI (x1, y1, x2, y2) 换算为像素矩形；ROI 无效或过小时返回 None"""
+    if not roi_norm or len(roi_norm) != 4:
+        return None
+    h, w = shape[:2]
+    try:
+        nx1, ny1, nx2, ny2 = (max(0.0, min(1.0, float(v))) for v in roi_norm)
+    except (TypeError, ValueError):
+        return None
+    nx1, nx2 = sorted((nx1, nx2))
+    ny1, ny2 = sorted((ny1, ny2))
+    x1, y1 = int(nx1 * w), int(ny1 * h)
+    x2, y2 = int(nx2 * w), int(ny2 * h)
+    if x2 - x1 < min_size or y2 - y1 < min_size:
+        return None
+    return x1, y1, x2, y2
+
+
+def crop_roi(frame, roi_norm):
+    """按归一化 ROI 裁剪帧
+
+    返回 (roi, (offset_x, offset_y))；roi 是原帧的 NumPy 视图（零拷贝），
+    调用方不得原地修改。ROI 未设置或无效时返回整帧与 (0, 0)。
+    """
+    rect = roi_rect(frame.shape, roi_norm)
+    if rect is None:
+        return frame, (0, 0)
+    x1, y1, x2, y2 = rect
+    return frame[y1:y2, x1:x2], (x1, y1)
+
+
+class PreprocessEngine:
+    """编译后的预处理流水线
+
+    根据 preprocess 配置一次性确定启用的步骤，逐帧执行时所有中间结果都写入按
+    (步骤, 形状) 复用的预分配缓冲区（OpenCV 的 dst 参数），稳态下不再分配整帧内存。
+
+    注意：process() 返回的数组属于引擎内部缓冲区，下一次 process() 会覆盖它；
+    需要长期保留结果时请自行 copy()。引擎不是线程安全的，每个线程应使用自己的实例
+    （get_preprocess_engine 已按线程缓存）。
+
+    Args:
+        cfg: preprocess 配置
+        output: 'bgr' 输出三通道（界面预览、RapidOCR 等）；'gray' 在转灰度后直接输出单通道，
+            仅适用于真正按单通道处理的下游。RapidOCR 的 LoadImage 会把单通道图像转回 BGR，
+            对它使用 'gray' 只是把转换挪到引擎内部，并不能省去这一步
+    """
+
+    def __init__(self, cfg: dict, output: str = 'bgr'):
+        self.cfg = dict(cfg or {})
+        self.output = output if output in ('bgr', 'gray') else 'bgr'
+        self._buffers: Dict[Tuple, np.ndarray] = {}
+        self.last_timings: Dict[str, float] = {}  # 最近一次各步骤耗时（毫秒）
+        self.steps: List[Tuple[str, Callable[[np.ndarray], np.ndarray]]] = self._compile()
+
+    def _compile(self):
+        steps = []
+        brightness, contrast = _brightness_contrast(self.cfg)
+        if brightness != 1.0 or contrast != 1.0:
+            self._alpha = contrast
+            self._beta = (brightness - 1.0) * 128
+            steps.append(('brightness_contrast', self._step_brightness_contrast))
+        if self.cfg.get('convert_to_gray', True):
+            steps.append(('gray', self._step_gray))
+        if _denoise_enabled(self.cfg):
+            method = _denoise_method(self.cfg)
+            self._nlm_h = float(self.cfg.get('denoise_strength', 10))
+            self._denoise_scale = min(1.0, max(0.1, float(self.cfg.get('denoise_scale', 0.5))))
+            steps.append(('denoise', getattr(self, f'_step_denoise_{method}')))
+        return steps
+
+    def _buffer(self, name: str, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        key = (name, shape, np.dtype(dtype).str)
+        buf = self._buffers.get(key)
+        if buf is None:
+            # 帧尺寸变化时丢弃该步骤的旧缓冲区
+            for k in [k for k in self._buffers if k[0] == name]:
+                del self._buffers[k]
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+        return buf
+
+    def _step_brightness_contrast(self, img):
+        dst = self._buffer('brightness_contrast', img.shape)
+        return cv2.convertScaleAbs(img, dst, alpha=self._alpha, beta=self._beta)
+
+    def _step_gray(self, img):
+        if img.ndim == 2:
+            return img
+        dst = self._buffer('gray', img.shape[:2])
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst)
+
+    def _step_denoise_nlmeans(self, img):
+        dst = self._buffer('denoise', img.shape)
+        return cv2.fastNlMeansDenoising(img, dst, self._nlm_h, 7, 21)
+
+    def _step_denoise_nlmeans_downscaled(self, img):
+        h, w = img.shape[:2]
+        sw, sh = max(1, int(w * self._denoise_scale)), max(1, int(h * self._denoise_scale))
+        small = cv2.resize(img, (sw, sh), self._buffer('denoise_small', (sh, sw) + img.shape[2:]),
+                           interpolation=cv2.INTER_AREA)
+        small = cv2.fastNlMeansDenoising(small, self._buffer('denoise_small_out', small.shape), self._nlm_h, 7, 21)
+        return cv2.resize(small, (w, h), self._buffer('denoise', img.shape), interpolation=cv2.INTER_LINEAR)
+
+    def _step_denoise_bilateral(self, img):
+        dst = self._buffer('denoise', img.shape)
+        return cv2.bilateralFilter(img, 5, 50, 50, dst)
+
+    def _step_denoise_median(self, img):
+        dst = self._buffer('denoise', img.shape)
+        return cv2.medianBlur(img, 3, dst)
+
+    def _step_denoise_gaussian(self, img):
+        dst = self._buffer('denoise', img.shape)
+        return cv2.GaussianBlur(img, (3, 3), 0, dst)
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """执行预处理；未启用任何步骤时原样返回输入（调用方不得修改它）"""
+        timings = {}
+        img = frame
+        for name, step in self.steps:
+            t0 = time.perf_counter()
+            img = step(img)
+            timings[name] = (time.perf_counter() - t0) * 1000.0
+        if self.output == 'bgr' and img.ndim == 2 and frame.ndim == 3:
+            t0 = time.perf_counter()
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR, self._buffer('to_bgr', img.shape + (3,)))
+            timings['to_bgr'] = (time.perf_counter() - t0) * 1000.0
+        self.last_timings = timings
+        return img
+
+
+_engines = threading.local()
+
+
+def get_preprocess_engine(cfg: dict, output: str = 'bgr') -> PreprocessEngine:
+    """获取当前线程中与配置对应的预处理引擎；配置不变时复用已编译的引擎及其缓冲区"""
+    key = (output, json.dumps(cfg or {}, sort_keys=True, ensure_ascii=False, default=str))
+    cache = getattr(_engines, 'cache', None)
+    if cache is None:
+        cache = _engines.cache = {}
+    engine = cache.get(key)
+    if engine is None:
+        # 每个线程只保留少量引擎，配置频繁切换时淘汰最早的
+        if len(cache) >= 4:
+            cache.pop(next(iter(cache)))
+        engine = cache[key] = PreprocessEngine(cfg, output)
+    return engine
+
 
+def apply_preprocess(frame, cfg: dict, output: str = 'bgr'):
+    """按配置预处理一帧
 
+    返回值可能是引擎内部缓冲区，在同一线程下一次调用前有效，见 PreprocessEngine。
+    """
+    return get_preprocess_engine(cfg, output).process(frame)
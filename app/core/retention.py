@@ -0,0 +1,203 @@
+from __future__ import annotations
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .db import SessionLocal, OcrResult
+
+
+# 默认关闭：清理会永久删除识别记录与快照，需用户显式开启并设置至少一项上限
+DEFAULT_RETENTION_CFG: Dict[str, Any] = {
+    'enabled': False,
+    'max_age_days': 0,         # 保留天数，0 表示不按时间清理
+    'max_count': 0,            # 最多保留的识别记录数，0 表示不限
+    'max_bytes_mb': 0,         # 快照目录总大小上限（MB），0 表示不限
+    'sweep_interval_sec': 600,
+    'batch_size': 200,         # 每个事务删除的记录数
+    'batch_pause_ms': 50,      # 批次间让出数据库，避免长时间占用写锁
+}
+
+
+def retention_settings(cfg: Optional[dict]) -> Dict[str, Any]:
+    merged = dict(DEFAULT_RETENTION_CFG)
+    merged.update(cfg or {})
+    return merged
+
+
+def retention_active(cfg: Optional[dict]) -> bool:
+    """已开启且至少设置了一项上限时才需要运行清理线程"""
+    settings = retention_settings(cfg)
+    if not settings.get('enabled'):
+        return False
+    return any(float(settings.get(key) or 0) > 0 for key in ('max_age_days', 'max_count', 'max_bytes_mb'))
+
+
+def shard_dir(base_dir: str, when: Optional[datetime] = None) -> str:
+    """按日期分片的快照目录：<base>/YYYY/MM/DD"""
+    when = when or datetime.now()
+    return os.path.join(base_dir, f'{when:%Y}', f'{when:%m}', f'{when:%d}')
+
+
+def _is_within(path: str, root: str) -> bool:
+    try:
+        return os.path.commonpath([os.path.abspath(path), root]) == root
+    except ValueError:
+        return False
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def directory_bytes(root: str) -> int:
+    """递归统计目录下所有文件的字节数"""
+    total = 0
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total
+
+
+class RetentionSweeper:
+    """按时间 / 数量 / 总字节数清理快照文件及对应的 OcrResult 记录
+
+    记录按 id 从旧到新分批删除，每批一个事务，事务提交后再删除文件（删库失败时文件保持不变）；
+    只删除位于快照目录内的文件，批量识别等导入的外部图片只删记录不删文件。按总字节数清理时
+    只删除能释放快照目录空间的记录，外部图片的记录保留。sweep() 可在任意后台线程中调用，
+    should_stop 返回真时在批次之间提前结束。
+    """
+
+    def __init__(self, snapshot_root: str, cfg: Optional[dict] = None, session_factory=None):
+        self.root = os.path.abspath(snapshot_root)
+        self.cfg = retention_settings(cfg)
+        self._session_factory = session_factory or SessionLocal
+
+    def sweep(self, should_stop=lambda: False) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        stats = {'rows': 0, 'files': 0, 'bytes': 0}
+        max_age = float(self.cfg.get('max_age_days') or 0)
+        if max_age > 0:
+            cutoff = datetime.utcnow() - timedelta(days=max_age)
+            self._delete_where(stats, should_stop, OcrResult.created_at < cutoff)
+        max_count = int(self.cfg.get('max_count') or 0)
+        if max_count > 0 and not should_stop():
+            excess = self._count() - max_count
+            if excess > 0:
+                self._delete_where(stats, should_stop, limit=excess)
+        max_bytes = int(float(self.cfg.get('max_bytes_mb') or 0) * 1024 * 1024)
+        if max_bytes > 0 and not should_stop():
+            excess = directory_bytes(self.root) - max_bytes
+            if excess > 0:
+                self._delete_where(stats, should_stop, byte_target=excess)
+        if stats['files']:
+            self._prune_empty_dirs()
+        stats['elapsed_ms'] = (time.perf_counter() - t0) * 1000.0
+        return stats
+
+    def _count(self) -> int:
+        session = self._session_factory()
+        try:
+            return session.query(OcrResult.id).count()
+        finally:
+            session.close()
+
+    def _delete_where(self, stats, should_stop, *criteria, limit: Optional[int] = None,
+                      byte_target: Optional[int] = None):
+        """从最旧的记录开始分批删除；limit 限制条数，byte_target 删够指定字节数即停"""
+        batch_size = max(1, int(self.cfg.get('batch_size', 200)))
+        pause = max(0, int(self.cfg.get('batch_pause_ms', 50))) / 1000.0
+        removed_rows = 0
+        freed = 0
+        last_id = 0
+        while not should_stop():
+            size = batch_size if limit is None else min(batch_size, limit - removed_rows)
+            if size <= 0:
+                break
+            session = self._session_factory()
+            try:
+                rows = (session.query(OcrResult.id, OcrResult.image_path, OcrResult.processed_image_path)
+                        .filter(OcrResult.id > last_id, *criteria)
+                        .order_by(OcrResult.id).limit(size).all())
+            finally:
+                session.close()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            ids, paths = [], []
+            for rid, *row_paths in rows:
+                row_paths = self._owned_paths(row_paths)
+                if byte_target is not None:
+                    # 按字节清理时跳过不占用快照目录空间的记录（外部图片、文件已不存在）
+                    row_bytes = sum(_file_size(p) for p in row_paths)
+                    if row_bytes <= 0:
+                        continue
+                    freed += row_bytes
+                ids.append(rid)
+                paths.extend(row_paths)
+                if byte_target is not None and freed >= byte_target:
+                    break
+            if ids:
+                # 先提交删库再删文件：删库失败时不会留下指向已删除文件的记录
+                self._delete_rows(ids)
+                freed_files, files = self._delete_files(paths)
+                stats['files'] += files
+                stats['bytes'] += freed_files
+                removed_rows += len(ids)
+                stats['rows'] += len(ids)
+            if byte_target is not None and freed >= byte_target:
+                break
+            if pause and ids:
+                time.sleep(pause)
+
+    def _owned_paths(self, paths: Iterable[Optional[str]]) -> List[str]:
+        """记录中位于快照目录内（可由清理删除）的文件路径"""
+        return sorted({p for p in paths if p and _is_within(p, self.root)})
+
+    def _delete_files(self, paths: Iterable[str]) -> Tuple[int, int]:
+        freed = files = 0
+        for path in paths:
+            size = _file_size(path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"删除快照失败: {path}: {e}")
+                continue
+            freed += size
+            files += 1
+        return freed, files
+
+    def _delete_rows(self, ids: List[int]):
+        session = self._session_factory()
+        try:
+            session.query(OcrResult).filter(OcrResult.id.in_(ids)).delete(synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    def _prune_empty_dirs(self):
+        """删除清理后留下的空日期分片目录（不删除快照根目录）"""
+        for dirpath, _dirnames, _files in os.walk(self.root, topdown=False):
+            if dirpath == self.root:
+                continue
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+SNAPSHOT_FORMATS = ('jpg', 'webp', 'png')
+
+# 快照文件名前缀：roi_ 为原始 ROI，result_ 为带标注的结果图（store_annotated 或旧版本保存）
+ROI_PREFIX = 'roi_'
+ANNOTATED_PREFIX = 'result_'
+
+DEFAULT_SNAPSHOT_CFG: Dict[str, Any] = {
+    'format': 'jpg',          # 'jpg' | 'webp' | 'png'
+    'jpeg_quality': 90,       # 0-100
+    'webp_quality': 80,       # 1-100，101 为无损
+    'png_compression': 3,     # 0-9，越大越小越慢
+    'max_dimension': 0,       # 长边上限（像素），0 表示不缩放
+    'grayscale': False,
+    'store_annotated': False,  # 是否另存带标注的结果图；默认查看时按需重绘
+}
+
+
+def snapshot_settings(cfg: Optional[dict]) -> Dict[str, Any]:
+    merged = dict(DEFAULT_SNAPSHOT_CFG)
+    merged.update(cfg or {})
+    if merged['format'] not in SNAPSHOT_FORMATS:
+        merged['format'] = 'jpg'
+    return merged
+
+
+def encode_snapshot(image: np.ndarray, cfg: Optional[dict]) -> Tuple[str, bytes, float]:
+    """按配置缩放、转灰度并编码图像
+
+    返回 (扩展名, 编码字节, 缩放比例)；缩放比例用于把原图坐标换算到快照坐标。
+    编码失败时抛出 ValueError。
+    """
+    s = snapshot_settings(cfg)
+    img = image
+    scale = 1.0
+    max_dim = int(s.get('max_dimension') or 0)
+    h, w = img.shape[:2]
+    if max_dim > 0 and max(h, w) > max_dim:
+        scale = max_dim / float(max(h, w))
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    if s.get('grayscale') and img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    fmt = s['format']
+    if fmt == 'webp':
+        params = [cv2.IMWRITE_WEBP_QUALITY, int(s.get('webp_quality', 80))]
+    elif fmt == 'png':
+        params = [cv2.IMWRITE_PNG_COMPRESSION, int(s.get('png_compression', 3))]
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(s.get('jpeg_quality', 90))]
+    ok, buf = cv2.imencode('.' + fmt, img, params)
+    if not ok:
+        raise ValueError(f'快照编码失败: {fmt}')
+    return fmt, buf.tobytes(), scale
+
+
+# ---------- 标注数据 ----------
+def dump_annotations(boxes, texts, scores) -> str:
+    """检测结果序列化为 det_boxes_json：[{box, text, score}, ...]（整帧坐标）"""
+    items = []
+    for box, text, score in zip(boxes, texts, scores):
+        items.append({
+            'box': np.asarray(box, dtype=np.float32).round(1).tolist(),
+            'text': str(text),
+            'score': round(float(score), 4),
+        })
+    return json.dumps(items, ensure_ascii=False)
+
+
+def parse_annotations(det_boxes_json: Optional[str]) -> List[Dict[str, Any]]:
+    """解析 det_boxes_json，兼容旧格式（仅坐标的框列表，无文本与置信度）"""
+    if not det_boxes_json:
+        return []
+    try:
+        data = json.loads(det_boxes_json)
+    except (TypeError, ValueError):
+        return []
+    items = []
+    for entry in data if isinstance(data, list) else []:
+        if isinstance(entry, dict) and 'box' in entry:
+            items.append({'box': entry['box'], 'text': entry.get('text', ''), 'score': entry.get('score')})
+        elif isinstance(entry, (list, tuple)):
+            items.append({'box': entry, 'text': '', 'score': None})
+    return items
+
+
+def dump_roi(offset: Tuple[int, int], size: Tuple[int, int], scale: float) -> str:
+    """roi_json：快照在整帧中的位置与缩放，用于把整帧坐标的标注映射到快照上"""
+    return json.dumps({'offset': [int(offset[0]), int(offset[1])],
+                       'size': [int(size[0]), int(size[1])],
+                       'scale': round(float(scale), 6)})
+
+
+def parse_roi(roi_json: Optional[str]) -> Dict[str, Any]:
+    try:
+        data = json.loads(roi_json) if roi_json else {}
+    except (TypeError, ValueError):
+        data = {}
+    return {
+        'offset': tuple(data.get('offset') or (0, 0)),
+        'size': tuple(data.get('size') or (0, 0)),
+        'scale': float(data.get('scale') or 1.0),
+    }
+
+
+def is_annotated_snapshot(path: str) -> bool:
+    """是否为应用保存的带标注结果图（已绘制检测框与文字，不宜再作为识别输入）"""
+    return os.path.basename(path).startswith(ANNOTATED_PREFIX)
+
+
+def snapshot_to_frame(boxes, roi: Dict[str, Any]) -> List[List[List[float]]]:
+    """快照坐标的检测框换算回整帧坐标（annotations_to_snapshot 的逆变换）"""
+    ox, oy = roi['offset']
+    scale = roi['scale'] or 1.0
+    return [(np.asarray(box, dtype=np.float32) / scale + (ox, oy)).tolist() for box in boxes]
+
+
+def annotations_to_snapshot(items: List[Dict[str, Any]], roi: Dict[str, Any]):
+    """整帧坐标的标注换算为快照坐标，返回 (boxes, texts, scores)"""
+    ox, oy = roi['offset']
+    scale = roi['scale']
+    boxes, texts, scores = [], [], []
+    for item in items:
+        box = (np.asarray(item['box'], dtype=np.float32) - (ox, oy)) * scale
+        boxes.append(box)
+        texts.append(item.get('text') or '')
+        scores.append(float(item['score']) if item.get('score') is not None else 0.0)
+    return boxes, texts, scores
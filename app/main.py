@@ -1,4 +1,5 @@
 from __future__ import annotations
+import multiprocessing
 import os
 import sys
 from PySide6.QtWidgets import QApplication
@@ -29,4 +30,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # 打包后的程序中，批量识别的工作进程需要由此入口接管
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Callable
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class AutoCaptureScheduler(QObject):
+    """连续自动拍照调度器
+
+    按 capture_interval_ms 定时触发 capture()；上一次识别仍在进行时（is_busy() 为真）
+    跳过本次触发，不在 OCR 队列中堆积任务。识别完成后由调用方调用 record_completion()，
+    调度器据此统计实际识别速率并通过 rateUpdated(实际次/秒, 期望次/秒) 报告。
+    """
+
+    rateUpdated = Signal(float, float)
+
+    def __init__(self, interval_ms: int, is_busy: Callable[[], bool], capture: Callable[[], bool],
+                 window_sec: float = 10.0, parent: QObject | None = None):
+        super().__init__(parent)
+        self._is_busy = is_busy
+        self._capture = capture
+        self._window_sec = float(window_sec)
+        self._completions: deque[float] = deque()
+        self._started_at = 0.0
+        self.ticks = 0
+        self.skipped = 0
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._on_tick)
+        self.set_interval(interval_ms)
+
+    @property
+    def interval_ms(self) -> int:
+        return self._timer.interval()
+
+    def set_interval(self, interval_ms: int):
+        self._timer.setInterval(max(50, int(interval_ms or 1000)))
+
+    def is_active(self) -> bool:
+        return self._timer.isActive()
+
+    def start(self):
+        if self._timer.isActive():
+            return
+        self._completions.clear()
+        self._started_at = time.monotonic()
+        self.ticks = 0
+        self.skipped = 0
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def requested_rate(self) -> float:
+        return 1000.0 / max(1, self._timer.interval())
+
+    def achieved_rate(self) -> float:
+        """最近 window_sec 秒内完成的识别次数 / 秒"""
+        now = time.monotonic()
+        self._trim(now)
+        span = min(self._window_sec, now - self._started_at) if self._started_at else 0.0
+        if span <= 0:
+            return 0.0
+        return len(self._completions) / span
+
+    def record_completion(self):
+        if not self._timer.isActive():
+            return
+        now = time.monotonic()
+        self._completions.append(now)
+        self._trim(now)
+
+    def _trim(self, now: float):
+        while self._completions and now - self._completions[0] > self._window_sec:
+            self._completions.popleft()
+
+    def _on_tick(self):
+        self.ticks += 1
+        if self._is_busy():
+            # 上一帧仍在识别，跳过本次触发
+            self.skipped += 1
+        elif not self._capture():
+            self.skipped += 1
+        self.rateUpdated.emit(self.achieved_rate(), self.requested_rate())
@@ -1,10 +1,73 @@
 from __future__ import annotations
+import threading
+import time
+from typing import Optional
+
 import cv2
 from PySide6.QtCore import QObject, QThread, Signal
 
+from ..core.metrics import metrics
+
+
+class CameraFrame:
+    """一帧相机画面及其元数据；image 写入信箱后不再被修改，消费者应按只读使用"""
+
+    __slots__ = ('seq', 'timestamp', 'image')
+
+    def __init__(self, seq: int, timestamp: float, image):
+        self.seq = seq
+        self.timestamp = timestamp  # time.monotonic() 采集时刻
+        self.image = image
+
+
+class FrameMailbox:
+    """单槽“最新帧”信箱
+
+    相机线程每读到一帧就覆盖槽位，旧帧若未被取走则直接丢弃，内存占用恒定为一帧；
+    消费者（GUI 线程）收到通知后调用 take() 拉取最新帧。通知只在上一次通知被
+    take() 消费后才会再次发出，因此 Qt 事件队列中最多只有一个待处理的帧通知。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame: Optional[CameraFrame] = None
+        self._seq = 0
+        self._notify_pending = False
+        self.overwritten = 0  # 未被取走即被覆盖的帧数
+
+    def put(self, image) -> Optional[CameraFrame]:
+        """写入新帧；需要向消费者发出通知时返回该帧，否则返回 None"""
+        with self._lock:
+            self._seq += 1
+            if self._frame is not None and self._notify_pending:
+                self.overwritten += 1
+            self._frame = CameraFrame(self._seq, time.monotonic(), image)
+            if self._notify_pending:
+                return None
+            self._notify_pending = True
+            return self._frame
+
+    def take(self) -> Optional[CameraFrame]:
+        """取走最新帧并重新允许通知；没有新帧时返回 None"""
+        with self._lock:
+            frame = self._frame if self._notify_pending else None
+            self._notify_pending = False
+            return frame
+
+    def latest(self) -> Optional[CameraFrame]:
+        """查看最新帧（不影响通知状态）"""
+        with self._lock:
+            return self._frame
+
+    def clear(self):
+        with self._lock:
+            self._frame = None
+            self._notify_pending = False
+
 
 class CameraWorker(QThread):
-    frameReady = Signal(object)
+    # 新帧通知（参数为帧序号）；帧本身通过 mailbox.take() 拉取
+    frameAvailable = Signal(int)
     devicesListed = Signal(list)
     error = Signal(str)
     stopped = Signal()
@@ -16,6 +79,7 @@ class CameraWorker(QThread):
         self.height = height
         self._running = False
         self.cap = None
+        self.mailbox = FrameMailbox()
 
     @staticmethod
     def list_devices(max_probe: int = 10):
@@ -91,10 +155,17 @@ class CameraWorker(QThread):
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
             while self._running:
-                ok, frame = self.cap.read()
+                # grab() 阻塞等待下一帧（耗时主要是帧间隔），只统计 retrieve() 的解码/拷贝耗时
+                if not self.cap.grab():
+                    continue
+                with metrics.span('camera_retrieve'):
+                    ok, frame = self.cap.retrieve()
                 if not ok:
                     continue
-                self.frameReady.emit(frame)
+                # 每次 read() 返回新的数组，直接放入信箱；仅在消费者取走上一帧后才发通知
+                packet = self.mailbox.put(frame)
+                if packet is not None:
+                    self.frameAvailable.emit(packet.seq)
         except Exception as e:
             self.error.emit(str(e))
         finally:
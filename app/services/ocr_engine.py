@@ -0,0 +1,279 @@
+from __future__ import annotations
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import get_resource_path
+
+try:
+    from rapidocr import RapidOCR, EngineType, LangDet, LangRec, ModelType, OCRVersion  # type: ignore
+    from rapidocr.ch_ppocr_rec import TextRecInput  # type: ignore
+except Exception:
+    RapidOCR = None  # type: ignore
+    TextRecInput = None  # type: ignore
+
+try:
+    import psutil  # type: ignore
+except Exception:
+    psutil = None  # type: ignore
+
+
+def ocr_engine_available() -> bool:
+    return RapidOCR is not None
+
+
+def build_rapidocr_params(cfg: dict) -> Dict[str, Any]:
+    """根据配置生成 RapidOCR 初始化参数（界面识别与调试窗口共用同一套参数）"""
+    onnx_cfg = cfg.get('onnx_ocr', {}) or {}
+    det_path = onnx_cfg.get('det_onnx') or get_resource_path('lib/models/custom_det_model/det.onnx')
+    rec_path = onnx_cfg.get('rec_onnx') or get_resource_path('lib/models/custom_rec_model/rec.onnx')
+    dict_path = onnx_cfg.get('dict_path') or get_resource_path('lib/models/dict_custom_chinese_date.txt')
+
+    params: Dict[str, Any] = {
+        'Global.use_cls': False,
+        'Det.box_thresh': float(onnx_cfg.get('det_box_thresh', 0.3)),
+        'Det.thresh': float(onnx_cfg.get('det_thresh', 0.1)),
+        'Det.unclip_ratio': float(onnx_cfg.get('det_unclip_ratio', 2.0)),
+        'Rec.rec_img_shape': [int(v) for v in onnx_cfg.get('rec_img_shape', [3, 48, 320])],
+        'Rec.rec_batch_num': max(1, int(onnx_cfg.get('rec_batch_size', 6))),
+    }
+    threads = int(onnx_cfg.get('intra_op_num_threads', -1))
+    if threads > 0:
+        params['EngineConfig.onnxruntime.intra_op_num_threads'] = threads
+    if RapidOCR is not None:
+        params.update({
+            'Det.engine_type': EngineType.ONNXRUNTIME,
+            'Rec.engine_type': EngineType.ONNXRUNTIME,
+            'Det.lang_type': LangDet.CH,
+            'Rec.lang_type': LangRec.CH,
+            'Det.model_type': ModelType.MOBILE,
+            'Rec.model_type': ModelType.MOBILE,
+            'Det.ocr_version': OCRVersion.PPOCRV5,
+            'Rec.ocr_version': OCRVersion.PPOCRV5,
+        })
+
+    # 只有当模型文件齐全时才使用自定义模型，否则使用 RapidOCR 默认模型
+    if all(os.path.exists(p) for p in (det_path, rec_path, dict_path)):
+        params['Det.model_path'] = det_path
+        params['Rec.model_path'] = rec_path
+        params['Rec.rec_keys_path'] = dict_path
+    return params
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _rss_bytes() -> int:
+    if psutil is None:
+        return 0
+    try:
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        return 0
+
+
+class SharedOcrEngine:
+    """进程内共享的 RapidOCR 实例
+
+    RapidOCR 的 __call__ 会通过 update_params 改写实例上的 use_det/use_cls/use_rec、
+    box_thresh 等状态，ONNX 会话本身也不应被多个线程同时驱动，因此所有推理都在
+    self.lock 下串行执行，且每次调用都显式传入各阶段开关。
+    """
+
+    def __init__(self, key: str, params: Dict[str, Any], engine: Any, init_ms: float, rss_delta: int):
+        self.key = key
+        self.params = dict(params)
+        self.engine = engine
+        self.lock = threading.RLock()
+        self.init_ms = init_ms
+        self.rss_delta = rss_delta
+        self.calls = 0
+        self.warmup_ms = 0.0
+
+    def __call__(self, image, use_det: bool = True, use_cls: bool = False, use_rec: bool = True, **kwargs):
+        # RapidOCR 每次调用都会用参数默认值（0.5 / 1.6）覆盖检测阈值，这里显式传入配置值
+        kwargs.setdefault('box_thresh', self.params.get('Det.box_thresh', 0.5))
+        kwargs.setdefault('unclip_ratio', self.params.get('Det.unclip_ratio', 1.6))
+        with self.lock:
+            self.calls += 1
+            return self.engine(image, use_det=use_det, use_cls=use_cls, use_rec=use_rec, **kwargs)
+
+    def recognize_batch(self, crops: Sequence[np.ndarray], batch_size: Optional[int] = None) -> Tuple[List[str], List[float]]:
+        """批量识别已裁剪的文本行图像，返回与 crops 一一对应的 (texts, scores)
+
+        按宽高比把图像分到 rec_img_shape 宽度的 1/2/4/… 倍桶中，每个桶内补齐到桶宽后
+        按 batch_size（默认 Rec.rec_batch_num）一次送入识别模型。桶宽固定使 ONNX 输入形状
+        只有少数几种，多行标签只需一两次推理。
+        """
+        n = len(crops)
+        texts: List[str] = [''] * n
+        scores: List[float] = [0.0] * n
+        if n == 0:
+            return texts, scores
+        batch_size = max(1, int(batch_size or self.params.get('Rec.rec_batch_num', 6)))
+
+        text_rec = getattr(self.engine, 'text_rec', None)
+        if text_rec is None or not hasattr(text_rec, 'resize_norm_img'):
+            # 非标准引擎：逐张识别
+            for i, crop in enumerate(crops):
+                result = self(crop, use_det=False, use_cls=False, use_rec=True)
+                txts = getattr(result, 'txts', None) or ('',)
+                scs = getattr(result, 'scores', None) or (0.0,)
+                texts[i], scores[i] = str(txts[0]), float(scs[0])
+            return texts, scores
+
+        img_c, img_h, img_w = (int(v) for v in text_rec.rec_image_shape[:3])
+        base_ratio = img_w / img_h
+        buckets: Dict[int, List[Tuple[int, np.ndarray, float]]] = {}
+        for i, crop in enumerate(crops):
+            if crop is None or crop.size == 0:
+                continue
+            if crop.ndim == 2:
+                crop = np.repeat(crop[:, :, None], img_c, axis=2)
+            ratio = crop.shape[1] / float(crop.shape[0])
+            # 桶倍数取不小于 ratio / base_ratio 的 2 的幂
+            mult = 1 << max(0, math.ceil(math.log2(max(ratio / base_ratio, 1.0))))
+            buckets.setdefault(mult, []).append((i, crop, ratio))
+
+        with self.lock:
+            for mult, items in sorted(buckets.items()):
+                max_ratio = base_ratio * mult
+                for beg in range(0, len(items), batch_size):
+                    chunk = items[beg:beg + batch_size]
+                    batch = np.stack([text_rec.resize_norm_img(crop, max_ratio) for _, crop, _ in chunk])
+                    preds = text_rec.session(batch.astype(np.float32))
+                    line_results, _ = text_rec.postprocess_op(
+                        preds, False,
+                        wh_ratio_list=[r for _, _, r in chunk],
+                        max_wh_ratio=max_ratio,
+                    )
+                    for (i, _, _), (txt, score) in zip(chunk, line_results):
+                        texts[i], scores[i] = str(txt), float(score)
+            self.calls += 1
+        return texts, scores
+
+    def warm_up(self, rec_img_shape: Sequence[int] = (3, 48, 320)) -> float:
+        """用空白图各跑一次检测与识别，触发 ONNX Runtime 首次推理的图优化与内存分配
+
+        识别输入使用配置的 rec_img_shape，使预热的张量形状与实际识别一致。返回耗时（毫秒）。
+        """
+        _, rec_h, rec_w = (int(v) for v in rec_img_shape)
+        t0 = time.perf_counter()
+        with self.lock:
+            det = getattr(self.engine, 'text_det', None)
+            rec = getattr(self.engine, 'text_rec', None)
+            if det is not None and rec is not None and TextRecInput is not None:
+                det(np.full((rec_w, rec_w, 3), 255, dtype=np.uint8))
+                rec(TextRecInput(img=[np.full((rec_h, rec_w, 3), 255, dtype=np.uint8)], return_word_box=False))
+            else:
+                self.engine(np.full((rec_h * 2, rec_w, 3), 255, dtype=np.uint8),
+                            use_det=True, use_cls=False, use_rec=True)
+        self.warmup_ms = (time.perf_counter() - t0) * 1000.0
+        return self.warmup_ms
+
+    def model_bytes(self) -> int:
+        total = 0
+        for name in ('Det.model_path', 'Rec.model_path', 'Rec.rec_keys_path'):
+            path = self.params.get(name)
+            if path and os.path.isfile(path):
+                total += os.path.getsize(path)
+        return total
+
+    def memory_info(self) -> Dict[str, Any]:
+        """会话内存占用：初始化前后进程 RSS 增量与模型文件大小（字节）"""
+        return {
+            'rss_delta_bytes': self.rss_delta,
+            'model_bytes': self.model_bytes(),
+            'init_ms': round(self.init_ms, 1),
+            'warmup_ms': round(self.warmup_ms, 1),
+            'calls': self.calls,
+        }
+
+
+class OcrEngineRegistry:
+    """按有效参数集缓存 RapidOCR 实例
+
+    参数相同的调用方拿到同一个实例；参数变化时才重新创建会话。
+    最多保留 max_engines 个实例，超出时淘汰最久未使用的一个。
+    """
+
+    def __init__(self, max_engines: int = 2):
+        self._max = max(1, int(max_engines))
+        self._engines: Dict[str, SharedOcrEngine] = {}
+        self._lock = threading.Lock()
+
+    def get(self, params: Dict[str, Any]) -> Optional[SharedOcrEngine]:
+        """返回参数对应的共享实例；RapidOCR 不可用或初始化失败时返回 None"""
+        if RapidOCR is None:
+            print("[ERROR] RapidOCR未安装")
+            return None
+        key = _params_key(params)
+        with self._lock:
+            shared = self._engines.pop(key, None)
+            if shared is None:
+                shared = self._create(key, params)
+                if shared is None:
+                    return None
+            # 重新插入以维持 LRU 顺序
+            self._engines[key] = shared
+            while len(self._engines) > self._max:
+                old_key = next(iter(self._engines))
+                self._engines.pop(old_key)
+                print("OCR引擎参数已变更，释放旧实例")
+            return shared
+
+    def _create(self, key: str, params: Dict[str, Any]) -> Optional[SharedOcrEngine]:
+        rss_before = _rss_bytes()
+        t0 = time.perf_counter()
+        try:
+            engine = RapidOCR(params=params)
+            print("RapidOCR初始化成功")
+        except Exception as e:
+            print(f"RapidOCR初始化失败: {e}")
+            try:
+                engine = RapidOCR()
+                print("使用默认RapidOCR配置")
+            except Exception as e2:
+                print(f"RapidOCR初始化完全失败: {e2}")
+                return None
+        init_ms = (time.perf_counter() - t0) * 1000.0
+        shared = SharedOcrEngine(key, params, engine, init_ms, max(0, _rss_bytes() - rss_before))
+        mem = shared.memory_info()
+        print(f"OCR引擎就绪: 初始化 {mem['init_ms']:.0f} ms, "
+              f"内存增量 {mem['rss_delta_bytes'] / 1048576:.1f} MB, 模型文件 {mem['model_bytes'] / 1048576:.1f} MB")
+        return shared
+
+    def engines(self):
+        with self._lock:
+            return list(self._engines.values())
+
+    def memory_info(self) -> Dict[str, Any]:
+        """所有缓存实例的内存占用汇总"""
+        engines = self.engines()
+        return {
+            'engines': len(engines),
+            'rss_delta_bytes': sum(e.rss_delta for e in engines),
+            'model_bytes': sum(e.model_bytes() for e in engines),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._engines.clear()
+
+
+_registry = OcrEngineRegistry()
+
+
+def get_ocr_registry() -> OcrEngineRegistry:
+    return _registry
+
+
+def get_ocr_engine(cfg: dict) -> Optional[SharedOcrEngine]:
+    """按当前配置获取进程内共享的 OCR 引擎"""
+    return _registry.get(build_rapidocr_params(cfg))
@@ -1,22 +1,22 @@
 from __future__ import annotations
 
+import multiprocessing
 import os
-from typing import List, Tuple, Optional, Any
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional, Any, Dict, Iterable, Iterator, Union
 
 import cv2
 import numpy as np
 
-from ..core.config import get_resource_path  # 导入路径处理函数
+from .ocr_engine import get_ocr_engine
+from ..core.preprocess import apply_preprocess
+from ..utils.text_order import sort_text_by_position
 
-try:
-    # RapidOCR is optional; we gate by config
-    from rapidocr import RapidOCR, EngineType, LangDet, LangRec, ModelType, OCRVersion  # type: ignore
-    pass  # RapidOCR 导入成功
-except Exception as e:
-    print(f"[ERROR] RapidOCR 导入失败: {e}")
-    import traceback
-    traceback.print_exc()
-    RapidOCR = None  # type: ignore
+
+# 识别结果置信度下限，与 RapidOCR 完整流程中的 text_score 默认值一致
+TEXT_SCORE = 0.5
 
 
 def _order_pts(pts: List[Tuple[float, float]]) -> np.ndarray:
@@ -75,120 +75,255 @@ def _crop_quad(img: np.ndarray, quad: List[Tuple[float, float]]) -> np.ndarray:
         return np.array([], dtype=np.uint8)
 
 
+def _read_image(path: str) -> Optional[np.ndarray]:
+    """读取图片（支持中文路径）"""
+    try:
+        data = np.fromfile(path, dtype=np.uint8)
+    except OSError:
+        return None
+    if data.size == 0:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+# ---------- recognize_many 工作进程 ----------
+_worker_pipeline: Optional['OCRPipeline'] = None
+_worker_preprocess: bool = False
+
+
+def _batch_worker_init(cfg: dict, preprocess: bool):
+    global _worker_pipeline, _worker_preprocess
+    _worker_pipeline = OCRPipeline(cfg)
+    _worker_preprocess = preprocess
+
+
+def _batch_worker_run(index: int, item: Union[str, np.ndarray]) -> Dict[str, Any]:
+    """单张图片：解码 → 预处理 → 检测 → 识别，文本按与界面保存时相同的语义顺序排列"""
+    source = item if isinstance(item, str) else None
+    result: Dict[str, Any] = {'index': index, 'source': source, 'text': '', 'confidence': 0.0,
+                              'boxes': [], 'texts': [], 'scores': [], 'error': None}
+    try:
+        image = _read_image(item) if source is not None else item
+        if image is None or image.size == 0:
+            result['error'] = '图片加载失败'
+            return result
+        if _worker_preprocess:
+            pp_cfg = _worker_pipeline.cfg.get('preprocess', {}) or {}
+            if pp_cfg.get('enable_preprocess', True):
+                image = apply_preprocess(image, pp_cfg)
+        boxes, texts, scores = _worker_pipeline.recognize_lines(image)
+        ordered = sort_text_by_position(boxes, texts, scores)
+        if ordered:
+            boxes, texts, scores = (list(v) for v in zip(*ordered))
+            result.update(text=' '.join(texts), confidence=sum(scores) / len(scores),
+                          boxes=boxes, texts=texts, scores=scores)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def default_batch_workers() -> int:
+    """按机器核数确定工作进程数（每个进程各持有一组 ONNX 会话，上限 8）"""
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
 class OCRPipeline:
     def __init__(self, cfg: dict):
         self.cfg = cfg
         self._rapid_ocr: Optional[Any] = None
+        self.last_batch_stats: Dict[str, Any] = {}
 
     def _init_rapidocr(self):
-        """初始化RapidOCR"""
+        """获取共享的RapidOCR实例（参数相同则与主界面共用同一组ONNX会话）"""
         if self._rapid_ocr is not None:
             return
-        
-        if RapidOCR is None:
-            print("[ERROR] RapidOCR未安装")
-            return
-        
+        self._rapid_ocr = get_ocr_engine(self.cfg)
+
+    @staticmethod
+    def _to_bgr(image: np.ndarray) -> Optional[np.ndarray]:
+        """确保图像是BGR格式，不支持的格式返回 None"""
+        if image is None or image.size == 0:
+            print("[ERROR] 输入图像无效")
+            return None
+        if len(image.shape) == 3 and image.shape[2] == 3:
+            return image
+        if len(image.shape) == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        print(f"[ERROR] 不支持的图像格式: shape={image.shape}")
+        return None
+
+    @staticmethod
+    def _boxes_to_int(boxes) -> List[List[Tuple[int, int]]]:
+        boxes_int = []
+        for box in boxes if boxes is not None else []:
+            if isinstance(box, (list, tuple)) and len(box) == 4:
+                boxes_int.append([(int(x), int(y)) for x, y in box])
+            elif isinstance(box, np.ndarray) and box.shape == (4, 2):
+                boxes_int.append([(int(x), int(y)) for x, y in box])
+        return boxes_int
+
+    def detect(self, image: np.ndarray) -> List[List[Tuple[int, int]]]:
+        """仅运行检测网络，返回文本框（用于实时叠加显示或缓存固定版面的文本位置）"""
+        self._init_rapidocr()
+        if self._rapid_ocr is None:
+            print("[ERROR] RapidOCR未初始化")
+            return []
+        ocr_image = self._to_bgr(image)
+        if ocr_image is None:
+            return []
         try:
-            # 获取模型路径
-            det_path = get_resource_path('lib/models/custom_det_model/det.onnx')
-            rec_path = get_resource_path('lib/models/custom_rec_model/rec.onnx')
-            dict_path = get_resource_path('lib/models/dict_custom_chinese_date.txt')
-            
-            # 检查模型文件是否存在
-            if not all(os.path.exists(p) for p in [det_path, rec_path, dict_path]):
-                print("[WARNING] 模型文件不完整，将使用默认模型")
-                self._rapid_ocr = RapidOCR()
-                return
-            
-            # 配置RapidOCR参数
-            onnx_cfg = self.cfg.get('onnx_ocr', {}) or {}
-            params = {
-                'Global.use_cls': False,
-                'Det.engine_type': EngineType.ONNXRUNTIME,
-                'Rec.engine_type': EngineType.ONNXRUNTIME,
-                'Det.lang_type': LangDet.CH,
-                'Rec.lang_type': LangRec.CH,
-                'Det.model_type': ModelType.MOBILE,
-                'Rec.model_type': ModelType.MOBILE,
-                'Det.ocr_version': OCRVersion.PPOCRV5,
-                'Rec.ocr_version': OCRVersion.PPOCRV5,
-                'Det.model_path': det_path,
-                'Rec.model_path': rec_path,
-                'Rec.rec_keys_path': dict_path,
-                'Det.box_thresh': float(onnx_cfg.get('det_box_thresh', 0.3)),
-                'Det.thresh': float(onnx_cfg.get('det_thresh', 0.1)),
-                'Det.unclip_ratio': float(onnx_cfg.get('det_unclip_ratio', 2.0)),
-                'Rec.rec_img_shape': list(onnx_cfg.get('rec_img_shape', [3, 48, 320])),
-            }
-            
-            self._rapid_ocr = RapidOCR(params=params)
-            print("RapidOCR初始化成功")
+            result = self._rapid_ocr(ocr_image, use_det=True, use_cls=False, use_rec=False)
         except Exception as e:
-            print(f"RapidOCR初始化失败: {e}")
-            # 使用默认配置
-            try:
-                self._rapid_ocr = RapidOCR()
-                print("使用默认RapidOCR配置")
-            except Exception as e2:
-                print(f"RapidOCR初始化完全失败: {e2}")
-                self._rapid_ocr = None
-
+            print(f"[ERROR] RapidOCR检测失败: {e}")
+            return []
+        return self._boxes_to_int(getattr(result, 'boxes', None))
 
+    def recognize_quads(self, image: np.ndarray, quads: List[List[Tuple[float, float]]]) -> Tuple[List[str], List[float]]:
+        """跳过检测网络，仅对给定四边形区域运行识别
 
+        适用于同一工装重复拍照、文本位置相对 ROI 固定的场景：先用 detect() 得到一次框，
+        之后直接复用。所有区域在一次批量识别中完成（见 recognize_crops）。
+        返回与 quads 一一对应的 (texts, scores)，裁剪失败的区域为 ('', 0.0)。
+        """
+        self._init_rapidocr()
+        if self._rapid_ocr is None:
+            print("[ERROR] RapidOCR未初始化")
+            return [], []
+        ocr_image = self._to_bgr(image)
+        if ocr_image is None:
+            return [], []
 
+        crops = []
+        for quad in quads or []:
+            crop = _crop_quad(ocr_image, quad)
+            # 与 RapidOCR 裁剪逻辑一致：竖排区域旋转为横排
+            if crop.size and crop.shape[0] / crop.shape[1] >= 1.5:
+                crop = np.ascontiguousarray(np.rot90(crop))
+            crops.append(crop)
+        return self.recognize_crops(crops)
 
-    def recognize(self, image: np.ndarray) -> Tuple[str, float, List[List[Tuple[int, int]]]]:
-        """使用RapidOCR进行完整的OCR识别"""
+    def recognize_crops(self, crops: List[np.ndarray]) -> Tuple[List[str], List[float]]:
+        """批量识别已裁剪的文本行，批大小取 onnx_ocr.rec_batch_size；空图像返回 ('', 0.0)"""
         self._init_rapidocr()
         if self._rapid_ocr is None:
             print("[ERROR] RapidOCR未初始化")
+            return [], []
+        batch_size = int((self.cfg.get('onnx_ocr', {}) or {}).get('rec_batch_size', 6))
+        try:
+            return self._rapid_ocr.recognize_batch(crops, batch_size)
+        except Exception as e:
+            print(f"[ERROR] RapidOCR批量识别失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return [''] * len(crops), [0.0] * len(crops)
+
+    def recognize(self, image: np.ndarray,
+                  quads: Optional[List[List[Tuple[float, float]]]] = None) -> Tuple[str, float, List[List[Tuple[int, int]]]]:
+        """使用RapidOCR进行OCR识别
+
+        quads 为 None 时运行完整的检测+识别；给定 quads 时跳过检测，仅识别这些区域，
+        并与完整流程一样过滤掉置信度低于 TEXT_SCORE 的结果。
+        """
+        if quads is not None:
+            texts, scores = self.recognize_quads(image, quads)
+            kept = [(self._boxes_to_int([q])[0], t, s) for q, t, s in zip(quads, texts, scores)
+                    if t and s >= TEXT_SCORE]
+            if not kept:
+                return '', 0.0, []
+            boxes_int, texts, scores = zip(*kept)
+            return ' '.join(texts), sum(scores) / len(scores), list(boxes_int)
+
+        boxes_int, texts, scores = self.recognize_lines(image)
+        if not boxes_int:
             return '', 0.0, []
+
+        # 合并所有文本
+        combined_text = ' '.join(texts) if texts else ''
+        avg_confidence = sum(scores) / len(scores) if scores else 0.0
+        return combined_text, avg_confidence, boxes_int
+
+    def recognize_lines(self, image: np.ndarray) -> Tuple[List[List[Tuple[int, int]]], List[str], List[float]]:
+        """完整的检测+识别，逐行返回 (boxes, texts, scores)，顺序为 RapidOCR 输出顺序"""
+        self._init_rapidocr()
+        if self._rapid_ocr is None:
+            print("[ERROR] RapidOCR未初始化")
+            return [], [], []
         
         try:
-            # 确保图像格式正确
-            if image is None or image.size == 0:
-                print("[ERROR] 输入图像无效")
-                return '', 0.0, []
-            
             # 确保图像是BGR格式
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                ocr_image = image.copy()
-            elif len(image.shape) == 2:
-                ocr_image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
-            else:
-                print(f"[ERROR] 不支持的图像格式: shape={image.shape}")
-                return '', 0.0, []
+            ocr_image = self._to_bgr(image)
+            if ocr_image is None:
+                return [], [], []
             
             # 执行OCR识别
-            result = self._rapid_ocr(ocr_image)
+            result = self._rapid_ocr(ocr_image, use_det=True, use_cls=False, use_rec=True)
             
-            if result is None or len(result.boxes) == 0:
-                return '', 0.0, []
-            
-            # 处理识别结果
-            boxes = result.boxes
-            texts = result.txts
-            scores = result.scores
+            if result is None or result.boxes is None or len(result.boxes) == 0:
+                return [], [], []
             
             # 转换检测框格式
-            boxes_int = []
-            for box in boxes:
-                if isinstance(box, (list, tuple)) and len(box) == 4:
-                    box_coords = [(int(x), int(y)) for x, y in box]
-                    boxes_int.append(box_coords)
-                elif isinstance(box, np.ndarray) and box.shape == (4, 2):
-                    box_coords = [(int(x), int(y)) for x, y in box]
-                    boxes_int.append(box_coords)
-            
-            # 合并所有文本
-            combined_text = ' '.join(texts) if texts else ''
-            avg_confidence = sum(scores) / len(scores) if scores else 0.0
-            
-            return combined_text, avg_confidence, boxes_int
+            boxes_int = self._boxes_to_int(result.boxes)
+            return boxes_int, [str(t) for t in result.txts], [float(v) for v in result.scores]
             
         except Exception as e:
             print(f"[ERROR] RapidOCR识别失败: {e}")
             import traceback
             traceback.print_exc()
-            return '', 0.0, []
\ No newline at end of file
+            return [], [], []
+
+    def recognize_many(self, items: Iterable[Union[str, np.ndarray]], workers: Optional[int] = None,
+                       preprocess: bool = False, max_in_flight: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """批量离线识别（例如模型更新后重新识别已保存的快照）
+
+        items 可以是图片路径或 BGR 数组，按输入顺序逐个产出结果字典：
+        index、source（路径或 None）、text、confidence、boxes、texts、scores、error。
+        每张图片在工作进程中依次完成解码、预处理（preprocess=True 且配置启用时）、检测与识别；
+        同时在途的任务数不超过 max_in_flight（默认 2 × 进程数），输入可以是惰性迭代器。
+        workers=0 时在当前进程内顺序执行。结束后吞吐量写入 last_batch_stats。
+        """
+        workers = default_batch_workers() if workers is None else max(0, int(workers))
+        started = time.perf_counter()
+        count = 0
+        try:
+            if workers == 0:
+                _batch_worker_init(self.cfg, preprocess)
+                for index, item in enumerate(items):
+                    result = _batch_worker_run(index, item)
+                    count += 1
+                    yield result
+                return
+
+            # 各进程平分 CPU，避免 ONNX Runtime 线程过度订阅
+            cfg = dict(self.cfg)
+            cfg['onnx_ocr'] = dict(cfg.get('onnx_ocr', {}) or {},
+                                   intra_op_num_threads=max(1, (os.cpu_count() or 1) // workers))
+            window = max(1, int(max_in_flight or workers * 2))
+            # spawn 与 Windows / 打包环境行为一致，也避免 fork 带有 Qt 线程的进程
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                     initializer=_batch_worker_init, initargs=(cfg, preprocess)) as pool:
+                pending = deque()
+                try:
+                    for index, item in enumerate(items):
+                        pending.append(pool.submit(_batch_worker_run, index, item))
+                        if len(pending) >= window:
+                            result = pending.popleft().result()
+                            count += 1
+                            yield result
+                    while pending:
+                        result = pending.popleft().result()
+                        count += 1
+                        yield result
+                finally:
+                    for future in pending:
+                        future.cancel()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.last_batch_stats = {
+                'images': count,
+                'seconds': elapsed,
+                'images_per_sec': count / elapsed if elapsed > 0 else 0.0,
+                'workers': workers,
+            }
+            print(f"批量识别完成: {count} 张, {elapsed:.1f} s, "
+                  f"{self.last_batch_stats['images_per_sec']:.2f} 张/秒 ({workers} 个进程)")
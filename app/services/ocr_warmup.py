@@ -0,0 +1,42 @@
+from __future__ import annotations
+import time
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from .ocr_engine import get_ocr_engine
+
+
+class OcrWarmupWorker(QThread):
+    """后台创建并预热 OCR 引擎
+
+    窗口显示后启动：创建 ONNX 会话（或取得已缓存的共享实例），再以 rec_img_shape
+    做一次空白推理，使首次拍照不再承担会话创建与首轮图优化的开销。
+    """
+
+    ready = Signal(object, object)  # (SharedOcrEngine, {'init_ms', 'warmup_ms', 'total_ms'})
+    failed = Signal(str)
+
+    def __init__(self, cfg: dict, parent: QObject | None = None):
+        super().__init__(parent)
+        self._cfg = cfg
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            engine = get_ocr_engine(self._cfg)
+            if engine is None:
+                self.failed.emit('RapidOCR初始化完全失败')
+                return
+            init_ms = (time.perf_counter() - t0) * 1000.0
+            rec_img_shape = (self._cfg.get('onnx_ocr', {}) or {}).get('rec_img_shape', [3, 48, 320])
+            warmup_ms = engine.warm_up(rec_img_shape)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.failed.emit(str(e))
+            return
+        self.ready.emit(engine, {
+            'init_ms': init_ms,
+            'warmup_ms': warmup_ms,
+            'total_ms': (time.perf_counter() - t0) * 1000.0,
+        })
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+
+# 队列溢出策略
+OVERFLOW_DROP_OLDEST = 'drop_oldest'  # 丢弃最早的待处理任务，保证识别的是最新画面
+OVERFLOW_REJECT_NEW = 'reject_new'    # 拒绝新提交的任务，保证已排队任务全部完成
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT_NEW)
+
+
+class OcrJob:
+    """一次识别任务：payload 由提交方定义，由 handler 在工作线程中解释"""
+
+    __slots__ = ('job_id', 'payload', 'submitted_at', 'started_at')
+
+    def __init__(self, job_id: int, payload: Any):
+        self.job_id = job_id
+        self.payload = payload
+        self.submitted_at = time.perf_counter()
+        self.started_at = 0.0
+
+
+class OcrWorker(QThread):
+    """OCR 推理线程：有界任务队列 + 结果信号
+
+    handler(payload) 在本线程中执行（推理、绘制、落盘等耗时操作），
+    返回值通过 resultReady 以 (job, result) 形式回到 GUI 线程。
+    handler 中不得直接操作任何 Qt 控件。
+    """
+
+    resultReady = Signal(object, object)  # (OcrJob, result)
+    jobFailed = Signal(object, str)       # (OcrJob, message)
+    jobDropped = Signal(object)           # OcrJob，因队列溢出被丢弃
+
+    def __init__(self, handler: Callable[[Any], Any], queue_size: int = 2,
+                 overflow_policy: str = OVERFLOW_DROP_OLDEST, parent: QObject | None = None):
+        super().__init__(parent)
+        self._handler = handler
+        self._queue_size = max(1, int(queue_size))
+        self._policy = overflow_policy if overflow_policy in OVERFLOW_POLICIES else OVERFLOW_DROP_OLDEST
+        self._queue: deque[OcrJob] = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._in_flight: Optional[OcrJob] = None
+        self._next_id = 1
+
+    @property
+    def overflow_policy(self) -> str:
+        return self._policy
+
+    def configure(self, queue_size: int, overflow_policy: str):
+        with self._cond:
+            self._queue_size = max(1, int(queue_size))
+            if overflow_policy in OVERFLOW_POLICIES:
+                self._policy = overflow_policy
+            dropped = []
+            while len(self._queue) > self._queue_size:
+                dropped.append(self._queue.popleft())
+        for job in dropped:
+            self.jobDropped.emit(job)
+
+    def submit(self, payload: Any) -> Optional[OcrJob]:
+        """提交任务；队列已满且策略为 reject_new 时返回 None"""
+        dropped = None
+        with self._cond:
+            if len(self._queue) >= self._queue_size:
+                if self._policy == OVERFLOW_REJECT_NEW:
+                    return None
+                dropped = self._queue.popleft()
+            job = OcrJob(self._next_id, payload)
+            self._next_id += 1
+            self._queue.append(job)
+            self._cond.notify()
+        if dropped is not None:
+            self.jobDropped.emit(dropped)
+        return job
+
+    def pending(self) -> int:
+        """排队中（尚未开始）的任务数"""
+        with self._cond:
+            return len(self._queue)
+
+    def is_busy(self) -> bool:
+        """是否有任务在排队或正在执行"""
+        with self._cond:
+            return self._in_flight is not None or bool(self._queue)
+
+    def clear(self):
+        with self._cond:
+            self._queue.clear()
+
+    def start(self, *args, **kwargs):
+        with self._cond:
+            self._running = True
+        super().start(*args, **kwargs)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                job = self._queue.popleft()
+                job.started_at = time.perf_counter()
+                self._in_flight = job
+            try:
+                result = self._handler(job.payload)
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                self.jobFailed.emit(job, str(e))
+            else:
+                self.resultReady.emit(job, result)
+            finally:
+                with self._cond:
+                    self._in_flight = None
+
+    def stop(self, timeout_ms: int = 5000):
+        """停止线程：丢弃排队任务，等待正在执行的任务结束"""
+        with self._cond:
+            self._running = False
+            self._queue.clear()
+            self._cond.notify_all()
+        self.wait(timeout_ms)
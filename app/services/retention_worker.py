@@ -0,0 +1,52 @@
+from __future__ import annotations
+import threading
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from ..core.retention import RetentionSweeper
+
+
+class RetentionWorker(QThread):
+    """后台定期执行快照保留策略，文件删除与分批删库都不占用界面线程
+
+    启动后先等待 initial_delay_sec（避开启动时的模型加载），之后每 interval_sec 清理一次；
+    每次清理后通过 swept(stats) 报告删除的记录数、文件数与字节数。
+    """
+
+    swept = Signal(object)   # {'rows', 'files', 'bytes', 'elapsed_ms'}
+    failed = Signal(str)
+
+    def __init__(self, sweeper: RetentionSweeper, interval_sec: float = 600.0,
+                 initial_delay_sec: float = 30.0, parent: QObject | None = None):
+        super().__init__(parent)
+        self._sweeper = sweeper
+        self._interval = max(10.0, float(interval_sec))
+        self._initial_delay = max(0.0, float(initial_delay_sec))
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def sweep_now(self):
+        """立即执行一次清理（例如修改保留配置后）"""
+        self._wake.set()
+
+    def run(self):
+        delay = self._initial_delay
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                stats = self._sweeper.sweep(should_stop=self._stop.is_set)
+            except Exception as e:
+                print(f"快照清理失败: {e}")
+                self.failed.emit(str(e))
+            else:
+                if stats.get('rows'):
+                    self.swept.emit(stats)
+            delay = self._interval
+
+    def stop(self, timeout_ms: int = 5000):
+        self._stop.set()
+        self._wake.set()
+        self.wait(timeout_ms)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from ..core.persistence import save_many
+from ..core.metrics import metrics
+from .ocr_worker import OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT_NEW
+
+
+# 除 ocr_worker 中的两种策略外，快照默认采用阻塞：队列满时生产方等待，不丢失识别结果
+OVERFLOW_BLOCK = 'block'
+SNAPSHOT_OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT_NEW)
+
+
+class SnapshotWrite:
+    """一条待落盘的快照：已编码的图像文件 + 对应的数据库行"""
+
+    __slots__ = ('files', 'row', 'tag')
+
+    def __init__(self, files: List[Tuple[str, bytes]], row: Dict[str, Any], tag: Any = None):
+        self.files = files  # [(路径, 编码字节), ...]
+        self.row = row      # OcrResult 字段
+        self.tag = tag
+
+    @property
+    def path(self) -> str:
+        return self.files[0][0] if self.files else ''
+
+
+class SnapshotWriter(QThread):
+    """快照写入线程：有界写后队列，图像文件逐个写入，数据库行每次刷新合并为一个事务
+
+    生产方（OCR 线程）只做 JPEG 编码并调用 submit()，慢速存储上的文件写入与 SQLite
+    提交都不再阻塞识别。每次刷新后通过 rowsSaved 发出 [(tag, rid), ...]。
+    """
+
+    rowsSaved = Signal(object)   # [(tag, rid), ...]
+    writeDropped = Signal(object)  # SnapshotWrite，因队列溢出被丢弃
+    writeFailed = Signal(object, str)  # (SnapshotWrite, message)
+
+    def __init__(self, queue_size: int = 32, overflow_policy: str = OVERFLOW_BLOCK,
+                 flush_interval_ms: int = 100, max_batch: int = 50, parent: QObject | None = None):
+        super().__init__(parent)
+        self._queue: deque[SnapshotWrite] = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._in_flight = 0
+        self._first_queued_at = 0.0
+        self.configure(queue_size, overflow_policy, flush_interval_ms, max_batch)
+
+    def configure(self, queue_size: int, overflow_policy: str, flush_interval_ms: int, max_batch: int):
+        with self._cond:
+            self._queue_size = max(1, int(queue_size))
+            self._policy = overflow_policy if overflow_policy in SNAPSHOT_OVERFLOW_POLICIES else OVERFLOW_BLOCK
+            self._flush_interval = max(0, int(flush_interval_ms)) / 1000.0
+            self._max_batch = max(1, int(max_batch))
+
+    def submit(self, item: SnapshotWrite, timeout: Optional[float] = None) -> bool:
+        """提交一条快照；被拒绝（reject_new 或 block 超时）或线程未运行时返回 False"""
+        dropped = None
+        with self._cond:
+            if not self._running:
+                return False
+            if len(self._queue) >= self._queue_size:
+                if self._policy == OVERFLOW_REJECT_NEW:
+                    return False
+                if self._policy == OVERFLOW_DROP_OLDEST:
+                    dropped = self._queue.popleft()
+                else:
+                    ok = self._cond.wait_for(lambda: len(self._queue) < self._queue_size or not self._running,
+                                             timeout)
+                    if not ok or not self._running:
+                        return False
+            if not self._queue:
+                self._first_queued_at = time.monotonic()
+            self._queue.append(item)
+            self._cond.notify_all()
+        if dropped is not None:
+            self.writeDropped.emit(dropped)
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """等待已提交的快照全部写完，返回是否在超时前完成"""
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def start(self, *args, **kwargs):
+        with self._cond:
+            self._running = True
+        super().start(*args, **kwargs)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    break  # 已停止且队列已清空
+                # 合并写入：攒够 max_batch 条，或最早一条排队满 flush_interval 时提交
+                deadline = self._first_queued_at + self._flush_interval
+                while self._running and len(self._queue) < self._max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._queue.popleft() for _ in range(min(self._max_batch, len(self._queue)))]
+                self._in_flight = len(batch)
+                self._cond.notify_all()  # 唤醒因队列满而等待的生产方
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch: List[SnapshotWrite]):
+        written: List[SnapshotWrite] = []
+        with metrics.span('snapshot_write'):
+            for item in batch:
+                try:
+                    for path, data in item.files:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        with open(path, 'wb') as f:
+                            f.write(data)
+                    written.append(item)
+                except Exception as e:
+                    print(f"快照写入失败: {item.path}: {e}")
+                    self.writeFailed.emit(item, str(e))
+        if not written:
+            return
+        try:
+            with metrics.span('db_flush'):
+                ids = save_many([item.row for item in written])
+        except Exception as e:
+            print(f"识别结果入库失败: {e}")
+            for item in written:
+                self.writeFailed.emit(item, str(e))
+            return
+        self.rowsSaved.emit([(item.tag, rid) for item, rid in zip(written, ids)])
+
+    def stop(self, timeout_ms: int = 10000):
+        """停止线程：先写完队列中剩余的快照"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.wait(timeout_ms)
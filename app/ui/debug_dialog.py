@@ -234,7 +234,11 @@ class DebugDialog(QDialog):
 
         # Use unified pipeline with runtime options
         self._apply_runtime_options()
-        text, conf, boxes = self._pipeline.recognize(img)
+        if recognize:
+            text, conf, boxes = self._pipeline.recognize(img)
+        else:
+            # 仅检测：不运行识别网络
+            text, conf, boxes = '', 0.0, self._pipeline.detect(img)
         self._boxes = self._sort_boxes_left_to_right(boxes or [])
         self._append_log(f'检测到 {len(self._boxes)} 个矩形（ONNX策略）')
         if recognize:
@@ -1,28 +1,19 @@
 from __future__ import annotations
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel
-from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QDialog, QVBoxLayout
+from PySide6.QtGui import QImage
+
+from .widgets import RoiGraphicsView
 
 class ImageViewerDialog(QDialog):
     def __init__(self, parent=None, title: str = '查看识别结果'):
         super().__init__(parent)
         self.setWindowTitle(title)
-        self._label = QLabel()
-        self._label.setAlignment(Qt.AlignCenter)
+        # 与预览共用视图：图像按比例适配窗口，标注以叠加层显示
+        self._view = RoiGraphicsView()
         lay = QVBoxLayout(self)
-        lay.addWidget(self._label)
+        lay.addWidget(self._view)
 
-    def setImage(self, qimg: QImage):
+    def setImage(self, qimg: QImage, boxes=None, texts=None, scores=None):
+        """显示图像；给出 boxes（图像坐标）时叠加检测框与标签，不修改图像像素"""
         self._qimg = qimg
-        self._update_pixmap()
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self._update_pixmap()
-
-    def _update_pixmap(self):
-        if not hasattr(self, '_qimg') or self._qimg is None:
-            return
-        self._label.setPixmap(QPixmap.fromImage(self._qimg).scaled(
-            self._label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        ))
+        self._view.set_image_with_chinese_text(qimg, boxes, texts, scores)
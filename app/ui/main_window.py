@@ -1,5 +1,8 @@
 from __future__ import annotations
 import os
+import time
+
+import cv2
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -38,6 +41,7 @@ class MainWindow(QMainWindow):
     clearAllData = Signal()
     deleteCurrentData = Signal(int)
     realtimeOcrToggled = Signal(bool)
+    autoCaptureToggled = Signal(bool)
 
     def __init__(self):
         super().__init__()
@@ -53,6 +57,9 @@ class MainWindow(QMainWindow):
         # Apply custom Fluent-like style globally
         set_theme('auto')
         set_accent_color(QColor(0, 120, 215))
+        # 预览节流：最大显示帧率与上次渲染时间
+        self._preview_interval = 1.0 / 15
+        self._last_preview_at = 0.0
         self._build_ui()
 
     def _build_ui(self):
@@ -66,6 +73,12 @@ class MainWindow(QMainWindow):
         self.act_cam_start = menu_cam.addAction('开启相机')
         self.act_cam_stop = menu_cam.addAction('关闭相机')
         self.act_cam_capture = menu_cam.addAction('拍照')
+        self.act_auto_capture = menu_cam.addAction('自动拍照')
+        self.act_auto_capture.setCheckable(True)
+        menu_cam.addSeparator()
+        self.act_roi_select = menu_cam.addAction('框选识别区域')
+        self.act_roi_select.setCheckable(True)
+        self.act_roi_clear = menu_cam.addAction('清除识别区域')
         menu_view = QMenu('视图', self)
         menubar.addMenu(menu_view)
         self.act_theme_auto = menu_view.addAction('主题：自动')
@@ -200,6 +213,10 @@ class MainWindow(QMainWindow):
         self.act_cam_start.triggered.connect(self.startCamera.emit)
         self.act_cam_stop.triggered.connect(self.stopCamera.emit)
         self.act_cam_capture.triggered.connect(self.captureNow.emit)
+        self.act_auto_capture.toggled.connect(lambda checked: self.autoCaptureToggled.emit(bool(checked)))
+        self.act_roi_select.toggled.connect(self._on_roi_select_toggled)
+        self.act_roi_clear.triggered.connect(self._on_roi_clear)
+        self.view.roiChanged.connect(self._on_roi_drawn)
         self.act_theme_auto.triggered.connect(lambda: self.apply_theme('auto'))
         self.act_theme_light.triggered.connect(lambda: self.apply_theme('light'))
         self.act_theme_dark.triggered.connect(lambda: self.apply_theme('dark'))
@@ -215,6 +232,13 @@ class MainWindow(QMainWindow):
         # start clock in status bar
         from PySide6.QtCore import QTimer, QTime
         self.statusBar()
+        # 自动拍照速率（常驻于状态栏右侧，不被时钟覆盖）
+        self.lbl_auto_capture = QLabel('')
+        self.statusBar().addPermanentWidget(self.lbl_auto_capture)
+        self.lbl_metrics = QLabel('')
+        self.statusBar().addPermanentWidget(self.lbl_metrics)
+        self.lbl_ocr_status = QLabel('')
+        self.statusBar().addPermanentWidget(self.lbl_ocr_status)
         self._clock = QTimer(self)
         self._clock.timeout.connect(lambda: self.statusBar().showMessage(QTime.currentTime().toString('HH:mm:ss')))
         self._clock.start(1000)
@@ -251,6 +275,20 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'onTogglePreprocess') and callable(self.onTogglePreprocess):
             self.onTogglePreprocess(bool(checked))
     
+    def _on_roi_select_toggled(self, checked: bool):
+        # 框选模式：在画面上拖拽鼠标绘制识别区域
+        self.view.roi_enabled = bool(checked)
+        self.view.setCursor(Qt.CrossCursor if checked else Qt.ArrowCursor)
+
+    def _on_roi_drawn(self, roi_norm):
+        # 画完一次后退出框选模式
+        if roi_norm is not None and self.act_roi_select.isChecked():
+            self.act_roi_select.setChecked(False)
+
+    def _on_roi_clear(self):
+        self.view.set_roi_norm(None)
+        self.view.roiChanged.emit(None)
+
     def _on_clear_all_data(self):
         """清空所有数据的回调"""
         self.clearAllData.emit()
@@ -269,10 +307,38 @@ class MainWindow(QMainWindow):
     def current_device(self) -> int:
         return int(self.cb_devices.currentData() or 0)
 
-    def show_frame(self, frame_bgr):
-        h, w, _ = frame_bgr.shape
-        qimg = QImage(frame_bgr.data, w, h, w*3, QImage.Format_BGR888)
-        self.view.setImage(qimg)
+    def set_preview_max_fps(self, fps: float):
+        """设置预览最大显示帧率，<=0 表示不限制"""
+        fps = float(fps or 0)
+        self._preview_interval = 1.0 / fps if fps > 0 else 0.0
+
+    def show_frame(self, frame_bgr) -> bool:
+        """显示相机帧，返回是否实际渲染
+
+        与相机采集帧率解耦：窗口不可见/最小化时不渲染，超过最大显示帧率的帧直接跳过；
+        大于视口的帧先缩小到视口尺寸再转换为 QPixmap。
+        """
+        if not self.isVisible() or self.isMinimized():
+            return False
+        now = time.monotonic()
+        if now - self._last_preview_at < self._preview_interval:
+            return False
+        self._last_preview_at = now
+
+        h, w = frame_bgr.shape[:2]
+        vp = self.view.viewport().size()
+        dpr = self.view.devicePixelRatioF()
+        scale = min(1.0, vp.width() * dpr / float(w), vp.height() * dpr / float(h))
+        disp = frame_bgr
+        if 0 < scale < 1.0:
+            dw, dh = max(1, int(w * scale)), max(1, int(h * scale))
+            # 缩小超过一半时用 INTER_AREA 避免文字摩尔纹，否则用更快的双线性
+            interp = cv2.INTER_AREA if scale < 0.5 else cv2.INTER_LINEAR
+            disp = cv2.resize(frame_bgr, (dw, dh), interpolation=interp)
+        dh, dw = disp.shape[:2]
+        qimg = QImage(disp.data, dw, dh, disp.strides[0], QImage.Format_BGR888)
+        self.view.setImage(qimg, source_size=(w, h))
+        return True
 
     def clear_frame(self):
         self.view.clearImage()
@@ -300,6 +366,24 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'act_cam_capture'):
             self.act_cam_capture.setEnabled(running)
 
+    def set_auto_capture_checked(self, checked: bool):
+        try:
+            self.act_auto_capture.blockSignals(True)
+            self.act_auto_capture.setChecked(bool(checked))
+        finally:
+            self.act_auto_capture.blockSignals(False)
+
+    def set_auto_capture_status(self, text: str):
+        self.lbl_auto_capture.setText(text or '')
+
+    def set_metrics_status(self, text: str, tooltip: str = ''):
+        self.lbl_metrics.setText(text or '')
+        self.lbl_metrics.setToolTip(tooltip or '')
+
+    def set_ocr_status(self, text: str, tooltip: str = ''):
+        self.lbl_ocr_status.setText(text or '')
+        self.lbl_ocr_status.setToolTip(tooltip or '')
+
     def set_preprocess_enabled(self, enabled: bool):
         try:
             self.act_toggle_preprocess.blockSignals(True)
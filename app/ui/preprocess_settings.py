@@ -24,7 +24,7 @@ from PySide6.QtWidgets import (
     QFileDialog,
 )
 
-from ..core.preprocess import apply_preprocess
+from ..core.preprocess import apply_preprocess, DEFAULT_DENOISE_METHOD
 from .fluent import PrimaryPushButton, PushButton
 from ..core.config import get_resource_path
 
@@ -75,6 +75,16 @@ class PreprocessSettingsDialog(QDialog):
 
         self.cb_denoise = QCheckBox('启用去噪')
         pp_form.addRow(self.cb_denoise)
+        self.cmb_denoise_method = QComboBox()
+        for label, method in (
+            ('中值滤波（最快）', 'median'),
+            ('高斯滤波', 'gaussian'),
+            ('双边滤波（推荐）', 'bilateral'),
+            ('NL-means 缩小计算', 'nlmeans_downscaled'),
+            ('NL-means 全分辨率（最慢）', 'nlmeans'),
+        ):
+            self.cmb_denoise_method.addItem(label, method)
+        pp_form.addRow('去噪方式', self.cmb_denoise_method)
 
         # 亮度/对比度
         from PySide6.QtWidgets import QAbstractSpinBox
@@ -133,6 +143,7 @@ class PreprocessSettingsDialog(QDialog):
         self.btn_save.clicked.connect(self._on_save)
         self.btn_cancel.clicked.connect(self.reject)
         self.cb_enable.toggled.connect(self._on_enable_toggled)
+        self.cb_denoise.toggled.connect(lambda c: self._set_widgets_enabled([self.cmb_denoise_method], c and self.cb_enable.isChecked()))
         # 移除形态学相关的控件启用/禁用逻辑
         # self.cb_morph.toggled.connect(lambda c: self._set_widgets_enabled([self.cmb_morph_type, self.sp_kernel], c))
         self.btn_browse_snapshot.clicked.connect(self._on_browse_snapshot)
@@ -148,6 +159,9 @@ class PreprocessSettingsDialog(QDialog):
         # 移除形态学相关配置加载
         # self.cb_morph.setChecked(bool(pp.get('morphology_enabled', True)))
         self.cb_denoise.setChecked(bool(pp.get('denoising_enabled', True)))
+        idx = self.cmb_denoise_method.findData(str(pp.get('denoise_method', DEFAULT_DENOISE_METHOD)))
+        self.cmb_denoise_method.setCurrentIndex(max(0, idx))
+        self._denoise_scale = float(pp.get('denoise_scale', 0.5))
         # brightness/contrast
         try:
             self.sp_brightness.setValue(float(pp.get('brightness', 1.0)))
@@ -182,6 +196,8 @@ class PreprocessSettingsDialog(QDialog):
             # 'kernel_size': int(self.sp_kernel.value()),
 
             'denoising_enabled': bool(self.cb_denoise.isChecked()),
+            'denoise_method': str(self.cmb_denoise_method.currentData()),
+            'denoise_scale': float(self._denoise_scale),
         }
         return cfg
 
@@ -193,6 +209,7 @@ class PreprocessSettingsDialog(QDialog):
             # self.cmb_morph_type,
             # self.sp_kernel,
             self.cb_denoise,
+            self.cmb_denoise_method,
             self.sp_brightness,
             self.sp_contrast,
         ]
@@ -201,8 +218,7 @@ class PreprocessSettingsDialog(QDialog):
 
     def _on_enable_toggled(self, checked: bool):
         self._apply_controls_enabled(bool(checked))
-        if checked:
-            self._sync_sub_features_enabled()
+        self._sync_sub_features_enabled()
 
     def _set_widgets_enabled(self, widgets, enabled: bool):
         for w in widgets:
@@ -214,8 +230,9 @@ class PreprocessSettingsDialog(QDialog):
     def _sync_sub_features_enabled(self):
         # 移除形态学相关的子功能启用逻辑
         # self._set_widgets_enabled([self.cmb_morph_type, self.sp_kernel], self.cb_morph.isChecked())
-        pass
-        
+        self._set_widgets_enabled([self.cmb_denoise_method],
+                                  self.cb_enable.isChecked() and self.cb_denoise.isChecked())
+
 
     def _on_preview(self):
         if self._current_frame is None:
@@ -1,9 +1,11 @@
 from .roi_graphics_view import RoiGraphicsView
 from .result_item_delegate import ResultItemDelegate
+from .ocr_overlay import OcrOverlay
 
 __all__ = [
     "RoiGraphicsView",
     "ResultItemDelegate",
+    "OcrOverlay",
 ]
 
 
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from PySide6.QtWidgets import (QGraphicsItem, QGraphicsItemGroup, QGraphicsPolygonItem, QGraphicsRectItem,
+                               QGraphicsScene, QGraphicsSimpleTextItem)
+from PySide6.QtGui import QBrush, QColor, QFont, QPen, QPolygonF
+from PySide6.QtCore import QPointF, Qt
+
+from ...utils.font_manager import get_font_manager
+
+
+class _LabelItem(QGraphicsRectItem):
+    """半透明背景 + 文本的标签，字号以屏幕像素计（不随图像缩放）"""
+
+    PADDING = 2
+
+    def __init__(self, parent: QGraphicsItem, font: QFont):
+        super().__init__(parent)
+        self.setFlag(QGraphicsItem.ItemIgnoresTransformations, True)
+        self.setPen(QPen(Qt.NoPen))
+        self.setBrush(QBrush(QColor(0, 255, 0, 128)))
+        self._text = QGraphicsSimpleTextItem(self)
+        self._text.setFont(font)
+        self._text.setPos(self.PADDING, self.PADDING)
+
+    def set_label(self, text: str, color: QColor):
+        if self._text.text() != text:
+            self._text.setText(text)
+            r = self._text.boundingRect()
+            # 标签底边贴在检测框左上角上方
+            self.setRect(0, -r.height() - 2 * self.PADDING, r.width() + 2 * self.PADDING,
+                         r.height() + 2 * self.PADDING)
+            self._text.setPos(self.PADDING, -r.height() - self.PADDING)
+        self.set_text_color(color)
+
+    def set_text_color(self, color: QColor):
+        if self._text.brush().color() != color:
+            self._text.setBrush(QBrush(color))
+
+
+class OcrOverlay:
+    """视图上的识别结果叠加层：检测框与标签作为矢量图元显示，不写入图像像素
+
+    图元按需创建后放入对象池，之后每次结果只原地更新几何、文本与可见性，多余的图元隐藏而不删除。
+    坐标为场景坐标（即原始帧像素坐标）；框线使用 cosmetic 画笔，线宽不随缩放变化。
+    """
+
+    def __init__(self, scene: QGraphicsScene, z_value: float = 10.0):
+        self._root = QGraphicsItemGroup()
+        self._root.setZValue(z_value)
+        scene.addItem(self._root)
+        self._boxes: list[QGraphicsPolygonItem] = []
+        self._labels: list[_LabelItem] = []
+        self._font = QFont()
+        self._font.setPointSize(12)
+        self._visible_count = 0
+
+    @staticmethod
+    def _pen(color: QColor) -> QPen:
+        pen = QPen(color, 2)
+        pen.setCosmetic(True)
+        return pen
+
+    @staticmethod
+    def text_color() -> QColor:
+        return QColor(*get_font_manager().text_color())
+
+    def _box(self, i: int) -> QGraphicsPolygonItem:
+        while i >= len(self._boxes):
+            item = QGraphicsPolygonItem(self._root)
+            item.setPen(self._pen(QColor(0, 255, 0)))
+            self._boxes.append(item)
+        return self._boxes[i]
+
+    def _label(self, i: int) -> _LabelItem:
+        while i >= len(self._labels):
+            self._labels.append(_LabelItem(self._root, self._font))
+        return self._labels[i]
+
+    def set_results(self, boxes, texts=None, scores=None, origin=QPointF(0, 0), box_color: QColor | None = None):
+        """显示一组检测结果（boxes 为四点坐标，texts/scores 可选），复用已有图元"""
+        boxes = list(boxes or [])
+        color = self.text_color()
+        pen = self._pen(box_color or QColor(0, 255, 0))
+        label_count = 0
+        for i, box in enumerate(boxes):
+            item = self._box(i)
+            item.setPolygon(QPolygonF([QPointF(origin.x() + float(x), origin.y() + float(y)) for x, y in box]))
+            if item.pen() != pen:
+                item.setPen(pen)
+            item.setVisible(True)
+
+            text = texts[i] if texts and i < len(texts) else ''
+            if isinstance(text, bytes):
+                text = text.decode('utf-8', errors='ignore')
+            if not text:
+                continue
+            score = float(scores[i]) if scores and i < len(scores) else 0.0
+            label = self._label(label_count)
+            label.set_label(f"{text} ({score:.2f})", color)
+            label.setPos(origin.x() + float(box[0][0]), origin.y() + float(box[0][1]))
+            label.setVisible(True)
+            label_count += 1
+
+        for item in self._boxes[len(boxes):]:
+            item.setVisible(False)
+        for label in self._labels[label_count:]:
+            label.setVisible(False)
+        self._visible_count = len(boxes)
+
+    def clear(self):
+        for item in self._boxes:
+            item.setVisible(False)
+        for label in self._labels:
+            label.setVisible(False)
+        self._visible_count = 0
+
+    def refresh_colors(self):
+        """主题变化后更新标签文字颜色"""
+        color = self.text_color()
+        for label in self._labels:
+            label.set_text_color(color)
+
+    def count(self) -> int:
+        return self._visible_count
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsTextItem, QApplication
-from PySide6.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QFont, QPolygonF, QPalette
-from PySide6.QtCore import Qt, QRectF, Signal, QPointF
-from ...utils.chinese_text_renderer import get_chinese_text_renderer
+from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
+from PySide6.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QFont, QTransform
+from PySide6.QtCore import Qt, QRectF, Signal
+from .ocr_overlay import OcrOverlay
 
 
 class RoiGraphicsView(QGraphicsView):
@@ -22,86 +22,72 @@ class RoiGraphicsView(QGraphicsView):
         self._dragging = False
         self._start = None
         self._rect_item = None
+        self._roi_norm = None  # 已保存的归一化 ROI (x1,y1,x2,y2)
         self._placeholder_text: str | None = None
-        self._detection_boxes = []  # 存储检测框
-        self._text_items = []  # 存储文本项
-        self._chinese_renderer = get_chinese_text_renderer()
+        # 识别结果叠加层：检测框与标签为复用的矢量图元，不绘制到图像像素中
+        self.overlay = OcrOverlay(self.scene)
+        self._fitted_rect = None  # 上次 fitInView 时图像的场景矩形
         
-    def _get_text_color(self):
-        """根据当前主题获取文字颜色"""
-        app = QApplication.instance()
-        if app is None:
-            return QColor(255, 255, 255)  # 默认白色
-        
-        # 获取当前调色板
-        palette = app.palette()
-        base_color = palette.color(QPalette.Base)
-        
-        # 判断是否为深色主题
-        is_dark = (0.2126 * base_color.redF() + 0.7152 * base_color.greenF() + 0.0722 * base_color.blueF()) < 0.5
-        
-        # 深色主题使用白色文字，浅色主题使用黑色文字
-        return QColor(255, 255, 255) if is_dark else QColor(0, 0, 0)
-    
     def refresh_text_colors(self):
-        """刷新所有文本项的颜色以适应主题变化"""
-        text_color = self._get_text_color()
-        color_str = f"rgb({text_color.red()}, {text_color.green()}, {text_color.blue()})"
-        
-        for text_item in self._text_items:
-            if text_item and text_item.scene() == self.scene:
-                # 更新默认文字颜色
-                text_item.setDefaultTextColor(text_color)
-                
-                # 获取当前HTML内容并更新颜色
-                current_html = text_item.toHtml()
-                # 简单的颜色替换，查找并替换color样式
-                import re
-                # 匹配color: rgb(r, g, b)模式
-                pattern = r'color:\s*rgb\([^)]+\)'
-                new_html = re.sub(pattern, f'color: {color_str}', current_html)
-                
-                # 如果没有找到color样式，则在style中添加
-                if 'color:' not in new_html:
-                    # 在style属性中添加color
-                    style_pattern = r'style="([^"]*)">'
-                    def add_color(match):
-                        existing_style = match.group(1)
-                        if existing_style and not existing_style.endswith(';'):
-                            existing_style += ';'
-                        return f'style="{existing_style} color: {color_str};">'
-                    new_html = re.sub(style_pattern, add_color, new_html)
-                
-                text_item.setHtml(new_html)
+        """刷新叠加层标签的颜色以适应主题变化"""
+        self.overlay.refresh_colors()
 
-    def setImage(self, qimg: QImage):
+    def setImage(self, qimg: QImage, source_size=None):
+        """显示图像
+
+        Args:
+            qimg: 待显示的图像（可以是已缩小到视口尺寸的预览图）
+            source_size: 原始帧尺寸 (w, h)；给出时图元按比例放大，
+                使场景坐标始终等于原始帧像素坐标（ROI 与检测框依赖这一点）
+        """
         # disable placeholder when showing an image
         self._placeholder_text = None
         self.pixmap_item.setPixmap(QPixmap.fromImage(qimg))
-        self.fitInView(self.pixmap_item, Qt.KeepAspectRatio)
+        sx = sy = 1.0
+        if source_size and qimg.width() > 0 and qimg.height() > 0:
+            sx = float(source_size[0]) / qimg.width()
+            sy = float(source_size[1]) / qimg.height()
+        self.pixmap_item.setTransform(QTransform.fromScale(sx, sy))
+        # 只有图像几何变化时才重新适配视图，避免每帧重算变换
+        rect = self.pixmap_item.sceneBoundingRect()
+        if rect != self._fitted_rect:
+            self._fitted_rect = rect
+            self.fitInView(self.pixmap_item, Qt.KeepAspectRatio)
+            self._sync_roi_item()
+
+    def set_roi_norm(self, roi_norm):
+        """显示已保存的 ROI；None 表示清除"""
+        self._roi_norm = tuple(roi_norm) if roi_norm else None
+        self._sync_roi_item()
+
+    def _roi_pen(self):
+        pen = QPen(QColor(0, 255, 0), 2)
+        pen.setCosmetic(True)  # 线宽不随图像缩放
+        return pen
+
+    def _sync_roi_item(self):
+        pix_rect = self.pixmap_item.sceneBoundingRect()
+        if not self._roi_norm or self.pixmap_item.pixmap().isNull() or pix_rect.isEmpty():
+            if self._rect_item and not self._dragging:
+                self.scene.removeItem(self._rect_item)
+                self._rect_item = None
+            return
+        x1, y1, x2, y2 = self._roi_norm
+        rect = QRectF(pix_rect.left() + x1 * pix_rect.width(), pix_rect.top() + y1 * pix_rect.height(),
+                      (x2 - x1) * pix_rect.width(), (y2 - y1) * pix_rect.height())
+        if self._rect_item:
+            self._rect_item.setRect(rect)
+        else:
+            self._rect_item = self.scene.addRect(rect, self._roi_pen())
 
     def clearImage(self):
         self.pixmap_item.setPixmap(QPixmap())
+        self._fitted_rect = None
         if self._rect_item:
             self.scene.removeItem(self._rect_item)
             self._rect_item = None
-        self._clear_detection_boxes()
-        self._clear_text_items()
+        self.overlay.clear()
         self.scene.update()
-        
-    def _clear_detection_boxes(self):
-        # 清除所有检测框
-        for box_item in self._detection_boxes:
-            if box_item in self.scene.items():
-                self.scene.removeItem(box_item)
-        self._detection_boxes = []
-        
-    def _clear_text_items(self):
-        # 清除所有文本项
-        for text_item in self._text_items:
-            if text_item in self.scene.items():
-                self.scene.removeItem(text_item)
-        self._text_items = []
 
     def setPlaceholder(self, text: str | None):
         self._placeholder_text = text or None
@@ -115,12 +101,14 @@ class RoiGraphicsView(QGraphicsView):
         # keep image fitted when the view size changes
         pix = self.pixmap_item.pixmap()
         if not pix.isNull():
+            self._fitted_rect = self.pixmap_item.sceneBoundingRect()
             self.fitInView(self.pixmap_item, Qt.KeepAspectRatio)
 
     def mousePressEvent(self, event):
         if self.roi_enabled and event.button() == Qt.LeftButton:
             self._dragging = True
-            self._start = event.position()
+            # 以场景坐标记录，场景坐标即原始帧像素坐标
+            self._start = self.mapToScene(event.position().toPoint())
             if self._rect_item:
                 self.scene.removeItem(self._rect_item)
                 self._rect_item = None
@@ -128,11 +116,12 @@ class RoiGraphicsView(QGraphicsView):
 
     def mouseMoveEvent(self, event):
         if self.roi_enabled and self._dragging and self._start is not None:
-            end = event.position()
+            end = self.mapToScene(event.position().toPoint())
             rect = QRectF(self._start, end).normalized()
             if self._rect_item:
-                self.scene.removeItem(self._rect_item)
-            self._rect_item = self.scene.addRect(rect, QPen(QColor(0, 255, 0), 2))
+                self._rect_item.setRect(rect)
+            else:
+                self._rect_item = self.scene.addRect(rect, self._roi_pen())
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
@@ -143,19 +132,20 @@ class RoiGraphicsView(QGraphicsView):
             and self._rect_item
         ):
             view_rect = self._rect_item.rect()
-            pix_rect = self.pixmap_item.boundingRect()
+            pix_rect = self.pixmap_item.sceneBoundingRect()
             nx1 = (view_rect.left() - pix_rect.left()) / max(1.0, pix_rect.width())
             ny1 = (view_rect.top() - pix_rect.top()) / max(1.0, pix_rect.height())
             nx2 = (view_rect.right() - pix_rect.left()) / max(1.0, pix_rect.width())
             ny2 = (view_rect.bottom() - pix_rect.top()) / max(1.0, pix_rect.height())
-            self.roiChanged.emit(
-                (
-                    max(0.0, min(1.0, nx1)),
-                    max(0.0, min(1.0, ny1)),
-                    max(0.0, min(1.0, nx2)),
-                    max(0.0, min(1.0, ny2)),
-                )
+            self._roi_norm = (
+                max(0.0, min(1.0, nx1)),
+                max(0.0, min(1.0, ny1)),
+                max(0.0, min(1.0, nx2)),
+                max(0.0, min(1.0, ny2)),
             )
+            self._dragging = False
+            self._sync_roi_item()
+            self.roiChanged.emit(self._roi_norm)
         self._dragging = False
         self._start = None
         super().mouseReleaseEvent(event)
@@ -174,38 +164,13 @@ class RoiGraphicsView(QGraphicsView):
         super().drawForeground(painter, rect)
         
     def set_detection_boxes(self, boxes):
-        """设置检测框并显示在视图上
+        """设置检测框并显示在视图上（红色，不带标签）
         
         Args:
             boxes: 检测框列表，每个框是四个点的坐标 [(x1,y1), (x2,y2), (x3,y3), (x4,y4)]
         """
-        # 清除旧的检测框
-        self._clear_detection_boxes()
-        
-        if not boxes:
-            return
-            
-        # 获取图像区域
-        pix_rect = self.pixmap_item.boundingRect()
-        
-        # 添加新的检测框
-        for box in boxes:
-            # 将检测框坐标转换为场景坐标
-            scene_points = []
-            for x, y in box:
-                scene_x = pix_rect.left() + x
-                scene_y = pix_rect.top() + y
-                scene_points.append((scene_x, scene_y))
-                
-            # 创建多边形并添加到场景
-            pen = QPen(QColor(255, 0, 0), 2)  # 红色边框
-            box_item = self.scene.addPolygon(
-                QPolygonF([QPointF(x, y) for x, y in scene_points]),
-                pen
-            )
-            self._detection_boxes.append(box_item)
-        
-        self.scene.update()
+        self.overlay.set_results(boxes, origin=self.pixmap_item.sceneBoundingRect().topLeft(),
+                                 box_color=QColor(255, 0, 0))
     
     def set_ocr_results(self, boxes, texts=None, scores=None):
         """设置OCR结果并显示检测框和中文文本
@@ -215,75 +180,10 @@ class RoiGraphicsView(QGraphicsView):
             texts: 文本内容列表（可选）
             scores: 置信度列表（可选）
         """
-        # 清除旧的检测框和文本
-        self._clear_detection_boxes()
-        self._clear_text_items()
-        
-        if not boxes:
-            return
-            
-        # 获取图像区域
-        pix_rect = self.pixmap_item.boundingRect()
-        
-        # 添加新的检测框
-        for i, box in enumerate(boxes):
-            # 将检测框坐标转换为场景坐标
-            scene_points = []
-            for x, y in box:
-                scene_x = pix_rect.left() + x
-                scene_y = pix_rect.top() + y
-                scene_points.append((scene_x, scene_y))
-                
-            # 创建多边形并添加到场景
-            pen = QPen(QColor(0, 255, 0), 2)  # 绿色边框
-            box_item = self.scene.addPolygon(
-                QPolygonF([QPointF(x, y) for x, y in scene_points]),
-                pen
-            )
-            self._detection_boxes.append(box_item)
-            
-            # 添加中文文本（如果提供了文本和置信度）
-            if texts and i < len(texts):
-                text = texts[i] if texts[i] else ""
-                score = scores[i] if scores and i < len(scores) else 0.0
-                
-                if text:
-                    # 确保文本正确编码
-                    if isinstance(text, bytes):
-                        text = text.decode('utf-8', errors='ignore')
-                    elif not isinstance(text, str):
-                        text = str(text)
-                    
-                    # 创建文本显示
-                    text_with_score = f"{text} ({score:.2f})"
-                    
-                    # 获取文本框左上角坐标
-                    x, y = scene_points[0]
-                    
-                    # 创建文本项
-                    text_item = QGraphicsTextItem(text_with_score)
-                    text_item.setPos(x, y - 30)  # 在检测框上方显示
-                    
-                    # 使用平台无关的字体或系统默认字体
-                    font = QFont()
-                    font.setPointSize(12)
-                    text_item.setFont(font)
-                    
-                    # 根据主题动态设置文字颜色
-                    text_color = self._get_text_color()
-                    text_item.setDefaultTextColor(text_color)
-                    
-                    # 添加背景，文字颜色也要在HTML中设置
-                    color_str = f"rgb({text_color.red()}, {text_color.green()}, {text_color.blue()})"
-                    text_item.setHtml(f'<div style="background-color: rgba(0, 255, 0, 128); padding: 2px; color: {color_str};">{text_with_score}</div>')
-                    
-                    self.scene.addItem(text_item)
-                    self._text_items.append(text_item)
-        
-        self.scene.update()
+        self.overlay.set_results(boxes, texts, scores, origin=self.pixmap_item.sceneBoundingRect().topLeft())
     
     def set_image_with_chinese_text(self, qimg: QImage, boxes=None, texts=None, scores=None):
-        """设置图像并在图像上绘制中文文本
+        """设置图像并以叠加层显示检测框与中文文本（不修改图像像素）
         
         Args:
             qimg: Qt图像
@@ -291,15 +191,5 @@ class RoiGraphicsView(QGraphicsView):
             texts: 文本内容列表（可选）
             scores: 置信度列表（可选）
         """
-        if boxes and texts:
-            # 使用中文渲染器在图像上绘制文本
-            qimg_with_text = self._chinese_renderer.draw_text_on_qimage(qimg, boxes, texts, scores or [])
-            self.setImage(qimg_with_text)
-        else:
-            self.setImage(qimg)
-        
-        # 同时在场景中显示检测框（可选）
-        if boxes:
-            self.set_ocr_results(boxes, texts, scores)
-
-
+        self.setImage(qimg)
+        self.set_ocr_results(boxes, texts, scores)
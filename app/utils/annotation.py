@@ -0,0 +1,142 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .font_manager import get_font_manager
+
+
+def get_chinese_font(size=20):
+    """获取中文字体（跨平台），每个字号只加载一次"""
+    return get_font_manager().get_font(size)
+
+
+LABEL_BG_RGB = (0, 255, 0)
+
+
+class LabelSprite:
+    """一个已栅格化的标签：预乘 alpha 的 BGR 颜色与 alpha，原点为文字绘制位置的外框左上角偏移"""
+
+    __slots__ = ('premul', 'inv_alpha', 'dx', 'dy')
+
+    def __init__(self, premul: np.ndarray, alpha: np.ndarray, dx: int, dy: int):
+        self.premul = premul                  # (h, w, 3) float32，BGR * alpha
+        self.inv_alpha = 1.0 - alpha          # (h, w, 1) float32
+        self.dx = dx
+        self.dy = dy
+
+    @property
+    def nbytes(self) -> int:
+        return self.premul.nbytes + self.inv_alpha.nbytes
+
+
+class LabelSpriteCache:
+    """标签精灵的 LRU 缓存，线程安全
+
+    每个 (文本, 字号, 文字颜色, 背景不透明度) 只用 PIL 栅格化一次（只绘制标签大小的灰度遮罩），
+    之后用 NumPy 混合到目标图像的对应矩形内，开销与标签面积成正比，与整帧大小无关。
+    """
+
+    def __init__(self, max_items: int = 512):
+        self._items: OrderedDict[tuple, LabelSprite] = OrderedDict()
+        self._max_items = max(1, int(max_items))
+        self._lock = threading.Lock()
+
+    def get(self, text: str, size: int = 20, text_color=(0, 0, 0), bg_alpha: float = 1.0) -> LabelSprite:
+        key = (text, int(size), tuple(int(c) for c in text_color), round(float(bg_alpha), 3))
+        with self._lock:
+            sprite = self._items.get(key)
+            if sprite is not None:
+                self._items.move_to_end(key)
+                return sprite
+        sprite = self._rasterize(*key)
+        with self._lock:
+            self._items[key] = sprite
+            if len(self._items) > self._max_items:
+                self._items.popitem(last=False)
+        return sprite
+
+    @staticmethod
+    def _rasterize(text: str, size: int, text_color, bg_alpha: float) -> LabelSprite:
+        fonts = get_font_manager()
+        left, top, right, bottom = fonts.text_bbox(text, size)
+        # 与 ImageDraw.rectangle 一致，外框包含右、下边界
+        w, h = max(1, right - left + 1), max(1, bottom - top + 1)
+        mask_img = Image.new('L', (w, h), 0)
+        ImageDraw.Draw(mask_img).text((-left, -top), text, font=fonts.get_font(size), fill=255)
+        coverage = np.asarray(mask_img, dtype=np.float32)[..., None] / 255.0
+        text_bgr = np.array(text_color[::-1], dtype=np.float32)
+        bg_bgr = np.array(LABEL_BG_RGB[::-1], dtype=np.float32)
+        # 文字覆盖在背景上：alpha = m + b(1-m)，预乘颜色 = 文字·m + 背景·b(1-m)
+        bg = float(bg_alpha) * (1.0 - coverage)
+        alpha = coverage + bg
+        premul = text_bgr * coverage + bg_bgr * bg
+        return LabelSprite(premul.astype(np.float32), alpha.astype(np.float32), left, top)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_sprites = LabelSpriteCache()
+
+
+def get_label_sprites() -> LabelSpriteCache:
+    return _sprites
+
+
+def blend_sprite(image: np.ndarray, sprite: LabelSprite, x: int, y: int):
+    """把精灵原地混合到 BGR 图像的 (x, y) 处，超出图像的部分裁掉"""
+    h, w = sprite.premul.shape[:2]
+    H, W = image.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(W, x + w), min(H, y + h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    sx, sy = x0 - x, y0 - y
+    region = image[y0:y1, x0:x1]
+    premul = sprite.premul[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+    inv_alpha = sprite.inv_alpha[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+    blended = region.astype(np.float32) * inv_alpha + premul
+    np.clip(blended + 0.5, 0, 255, out=blended)
+    region[...] = blended.astype(np.uint8)
+
+
+def draw_labels(image, boxes, texts, scores, text_color=(0, 0, 0), size: int = 20,
+                y_offset: int = 25, bg_alpha: float = 1.0):
+    """在 BGR 图像上原地绘制标签 "文本 (置信度)"，标签位于每个文本框左上角上方 y_offset 像素处"""
+    sprites = get_label_sprites()
+    for box, text, score in zip(boxes, texts, scores):
+        if box is None or len(box) < 1:
+            continue
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', errors='ignore')
+        x, y = int(box[0][0]), int(box[0][1])
+        sprite = sprites.get(f"{text} ({float(score):.2f})", size, text_color, bg_alpha)
+        blend_sprite(image, sprite, x + sprite.dx, y - y_offset + sprite.dy)
+    return image
+
+
+def draw_chinese_text(image, boxes, texts, scores, text_color=(0, 0, 0)):
+    """在 BGR 图像上每个文本框的左上方绘制 "文本 (置信度)"，返回新的 BGR 图像
+
+    不依赖 Qt，可在任意线程调用；text_color（RGB）由调用方按当前主题决定。
+    标签以缓存的精灵混合到各自的矩形内，不再整帧转换为 PIL 图像。
+    """
+    return draw_labels(image.copy(), boxes, texts, scores, text_color)
+
+
+def render_annotations(image, boxes, texts, scores, text_color=(0, 0, 0)):
+    """生成带检测框与文本的结果图（不修改输入图像），单通道输入会转为 BGR"""
+    result_image = image.copy() if image.ndim == 3 else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    for box in boxes:
+        pts = np.asarray(box, dtype=np.int32).reshape(-1, 1, 2)
+        cv2.polylines(result_image, [pts], True, (0, 255, 0), 2)
+    labeled = [(b, t, s) for b, t, s in zip(boxes, texts, scores) if t]
+    if not labeled:
+        return result_image
+    boxes, texts, scores = zip(*labeled)
+    return draw_labels(result_image, boxes, texts, scores, text_color)
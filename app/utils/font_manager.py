@@ -0,0 +1,134 @@
+from __future__ import annotations
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PIL import ImageFont
+
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 按优先级排列：项目内置字体、Windows 系统字体、Linux 常见中文字体（包含 Docker 场景）
+FONT_SEARCH_PATHS = (
+    os.path.join(_ROOT, 'assets', 'fonts', 'NotoSansSC-Regular.otf'),
+    os.path.join(_ROOT, 'assets', 'fonts', 'NotoSansSC-Regular.ttf'),
+    os.path.join(_ROOT, 'assets', 'fonts', 'msyh.ttc'),
+    "C:/Windows/Fonts/msyh.ttc",  # 微软雅黑
+    "C:/Windows/Fonts/simhei.ttf",  # 黑体
+    "C:/Windows/Fonts/simsun.ttc",  # 宋体
+    "C:/Windows/Fonts/msyh.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/noto/NotoSansSC-Regular.otf",
+    "/usr/share/fonts/truetype/noto/NotoSansSC-Regular.ttf",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/truetype/arphic/ukai.ttf",
+    "/usr/share/fonts/truetype/arphic/uming.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # 兜底
+)
+
+_DEFAULT_FONT = '<default>'
+
+
+class FontManager:
+    """中文字体与标注文字颜色的进程内缓存，线程安全
+
+    字体路径只解析一次，每个 (路径, 字号) 只从磁盘加载一次；文本外框按 (路径, 字号, 文本)
+    缓存（LRU）。文字颜色由 Qt 调色板决定，只在主题变化时调用 invalidate_text_color() 后重新读取；
+    本模块不主动导入 Qt，未加载 Qt 时（命令行、基准）颜色固定为黑色。
+    """
+
+    def __init__(self, search_paths=FONT_SEARCH_PATHS, max_metrics: int = 2048):
+        self._search_paths = tuple(search_paths)
+        self._lock = threading.Lock()
+        self._path: Optional[str] = None
+        self._resolved = False
+        self._fonts: Dict[Tuple[str, int], ImageFont.ImageFont] = {}
+        self._metrics: OrderedDict[Tuple[str, int, str], Tuple[int, int, int, int]] = OrderedDict()
+        self._max_metrics = max(1, int(max_metrics))
+        self._text_color: Optional[Tuple[int, int, int]] = None
+
+    # ---------- 字体 ----------
+    def font_path(self) -> Optional[str]:
+        """第一个存在且可加载的字体路径，找不到时为 None（使用 PIL 默认字体）"""
+        with self._lock:
+            if not self._resolved:
+                self._path = self._resolve_locked()
+                self._resolved = True
+            return self._path
+
+    def _resolve_locked(self) -> Optional[str]:
+        for font_path in self._search_paths:
+            if not os.path.exists(font_path):
+                continue
+            try:
+                self._fonts[(font_path, 20)] = ImageFont.truetype(font_path, 20)
+                return font_path
+            except Exception:
+                continue
+        return None
+
+    def get_font(self, size: int = 20):
+        path = self.font_path() or _DEFAULT_FONT
+        key = (path, int(size))
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is None:
+                try:
+                    font = ImageFont.load_default() if path == _DEFAULT_FONT else ImageFont.truetype(path, int(size))
+                except Exception as e:
+                    print(f"字体加载失败: {e}")
+                    font = ImageFont.load_default()
+                self._fonts[key] = font
+            return font
+
+    def text_bbox(self, text: str, size: int = 20) -> Tuple[int, int, int, int]:
+        """文本在原点处的外框 (left, top, right, bottom)，等同 ImageDraw.textbbox((0, 0), text)"""
+        key = (self.font_path() or _DEFAULT_FONT, int(size), text)
+        with self._lock:
+            bbox = self._metrics.get(key)
+            if bbox is not None:
+                self._metrics.move_to_end(key)
+                return bbox
+        bbox = tuple(int(v) for v in self.get_font(size).getbbox(text))
+        with self._lock:
+            self._metrics[key] = bbox
+            if len(self._metrics) > self._max_metrics:
+                self._metrics.popitem(last=False)
+        return bbox
+
+    # ---------- 文字颜色 ----------
+    def text_color(self) -> Tuple[int, int, int]:
+        """当前主题下的标注文字颜色（RGB）：深色主题白色，浅色主题黑色"""
+        color = self._text_color
+        if color is None:
+            color = self._text_color = self._read_theme_color()
+        return color
+
+    def invalidate_text_color(self):
+        self._text_color = None
+
+    @staticmethod
+    def _read_theme_color() -> Tuple[int, int, int]:
+        qt_widgets = sys.modules.get('PySide6.QtWidgets')
+        qt_gui = sys.modules.get('PySide6.QtGui')
+        app = qt_widgets.QApplication.instance() if qt_widgets is not None else None
+        if app is None or qt_gui is None:
+            return (0, 0, 0)
+        base_color = app.palette().color(qt_gui.QPalette.Base)
+        is_dark = (0.2126 * base_color.redF() + 0.7152 * base_color.greenF() + 0.0722 * base_color.blueF()) < 0.5
+        return (255, 255, 255) if is_dark else (0, 0, 0)
+
+
+_manager: Optional[FontManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_font_manager() -> FontManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = FontManager()
+        return _manager
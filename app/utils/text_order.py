@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+
+def _text_priority(text: str) -> int:
+    """标签文本的语义顺序：生产日期 → 日期 → CH → 合格 → 其他"""
+    text = text.strip()
+    if '生产日期' in text:
+        return 1
+    elif '/' in text and len(text.split('/')) == 3:  # 日期格式 YYYY/MM/DD
+        return 2
+    elif text == 'CH':
+        return 3
+    elif '合格' in text:
+        return 4
+    else:
+        return 5  # 其他文本
+
+
+def sort_text_by_position(boxes, texts, scores):
+    """根据文本内容和位置对文本进行智能排序，确保正确的语义顺序
+
+    先按语义优先级，再按文本框中心的 y、x 坐标排序。返回 [(box, text, score), ...]。
+    """
+    if len(boxes) == 0 or len(texts) == 0:
+        return []
+
+    # 创建包含位置信息和文本内容的元组列表
+    text_items = []
+    for box, text, score in zip(boxes, texts, scores):
+        # 确保文本正确编码
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', errors='ignore')
+        elif not isinstance(text, str):
+            text = str(text)
+
+        # 计算文本框的中心点
+        if len(box) >= 4:
+            x_coords = [point[0] for point in box]
+            y_coords = [point[1] for point in box]
+            center_x = sum(x_coords) / len(x_coords)
+            center_y = sum(y_coords) / len(y_coords)
+            text_items.append((center_x, center_y, box, text, score))
+
+    # 首先按照文本内容的语义优先级排序，然后按位置排序
+    text_items.sort(key=lambda item: (_text_priority(item[3]), item[1], item[0]))
+
+    # 返回排序后的结果
+    return [(item[2], item[3], item[4]) for item in text_items]
@@ -0,0 +1,179 @@
+"""ocr_results 表结构与 SQLite 参数基准：写入与查询吞吐，调优前后对比
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_db [--rows 1000000] [--out benchmarks/results]
+
+在临时目录中分别建两个库：
+    baseline  仅主键、无索引，SQLite 默认参数（journal_mode=DELETE, synchronous=FULL）
+    tuned     init_db 建表与迁移（created_at/confidence/date_text 索引），SQLITE_PRAGMAS（WAL 等）
+写入分两项：批量导入 --rows 行（每 10000 行一个事务，反映索引维护开销），以及按应用快照写入线程
+的方式逐批提交（每批 --commit-batch 行一个事务，反映每次提交的同步开销）。
+查询项为审计常用的按时间范围、置信度、文本前缀过滤，以及列表分页与计数。
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateTable
+
+from app.core.db import OcrResult, init_db, apply_sqlite_pragmas, SCHEMA_VERSION
+
+BULK_CHUNK = 10000
+T0 = datetime(2025, 1, 1)
+
+
+def _rows(start: int, count: int, rng: random.Random):
+    """确定性的模拟识别记录：每 2 秒一条，文本为生产日期标签"""
+    out = []
+    for i in range(start, start + count):
+        day = T0 + timedelta(days=rng.randrange(365))
+        out.append({
+            'image_path': f'snapshots/{i:08d}.jpg',
+            'processed_image_path': None,
+            'date_text': f"生产日期 {day:%Y/%m/%d} CH 合格",
+            'confidence': round(rng.uniform(0.3, 1.0), 4),
+            'created_at': T0 + timedelta(seconds=2 * i),
+            'det_boxes_json': '[]',
+        })
+    return out
+
+
+def _build(path: str, tuned: bool):
+    engine = create_engine(f'sqlite:///{path}', future=True)
+    if tuned:
+        apply_sqlite_pragmas(engine)
+        init_db(engine)
+    else:
+        # 调优前的结构：CreateTable 不包含索引，只有主键
+        with engine.begin() as conn:
+            conn.execute(CreateTable(OcrResult.__table__))
+    return engine
+
+
+def _time(fn, repeat: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - t0) * 1000.0 / repeat, out
+
+
+def run_variant(workdir: str, name: str, tuned: bool, rows: int, commit_batch: int, commits: int):
+    path = os.path.join(workdir, f'{name}.sqlite3')
+    engine = _build(path, tuned)
+    insert = OcrResult.__table__.insert()
+    rng = random.Random(0)
+    result = {'name': name}
+
+    t0 = time.perf_counter()
+    for start in range(0, rows, BULK_CHUNK):
+        batch = _rows(start, min(BULK_CHUNK, rows - start), rng)
+        with engine.begin() as conn:
+            conn.execute(insert, batch)
+    elapsed = time.perf_counter() - t0
+    result['bulk_rows_per_s'] = rows / elapsed if elapsed > 0 else 0.0
+
+    t0 = time.perf_counter()
+    for c in range(commits):
+        batch = _rows(rows + c * commit_batch, commit_batch, rng)
+        with engine.begin() as conn:
+            conn.execute(insert, batch)
+    elapsed = time.perf_counter() - t0
+    result['commits_per_s'] = commits / elapsed if elapsed > 0 else 0.0
+
+    total = rows + commits * commit_batch
+    mid = T0 + timedelta(seconds=total)  # 数据时间范围的中点
+    queries = {
+        'count': ("SELECT COUNT(id) FROM ocr_results", {}),
+        'created_at_range': ("SELECT id, date_text, confidence FROM ocr_results "
+                             "WHERE created_at >= :a AND created_at < :b ORDER BY created_at",
+                             {'a': mid, 'b': mid + timedelta(hours=1)}),
+        'low_confidence': ("SELECT id, date_text FROM ocr_results WHERE confidence < :c ORDER BY confidence LIMIT 100",
+                           {'c': 0.31}),
+        'date_text_prefix': ("SELECT id, confidence FROM ocr_results WHERE date_text >= :a AND date_text < :b",
+                             {'a': '生产日期 2025/03/01', 'b': '生产日期 2025/03/02'}),
+        'page_keyset': ("SELECT id, date_text, confidence, image_path, processed_image_path, created_at "
+                        "FROM ocr_results WHERE id < :b ORDER BY id DESC LIMIT 20", {'b': total // 2}),
+        'page_offset': ("SELECT id, date_text, confidence, image_path, processed_image_path, created_at "
+                        "FROM ocr_results ORDER BY id DESC LIMIT 20 OFFSET :o", {'o': total // 2}),
+    }
+    result['queries_ms'] = {}
+    with engine.connect() as conn:
+        for qname, (sql, params) in queries.items():
+            stmt = text(sql)
+            conn.execute(stmt, params).fetchall()  # 预热页缓存
+            ms, out = _time(lambda: conn.execute(stmt, params).fetchall(), repeat=5)
+            result['queries_ms'][qname] = ms
+        result['journal_mode'] = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+    result['db_mb'] = os.path.getsize(path) / 1024 / 1024
+    return result
+
+
+def print_report(results):
+    base, tuned = results
+    print(f"{'':<20}{base['name']:>14}{tuned['name']:>14}{'变化':>10}")
+    for key, label in (('bulk_rows_per_s', '批量写入 行/秒'), ('commits_per_s', '逐批提交 次/秒'), ('db_mb', '库大小 MB')):
+        b, t = base[key], tuned[key]
+        print(f"{label:<18}{b:>14.1f}{t:>14.1f}{_ratio(t, b):>10}")
+    for q in base['queries_ms']:
+        b, t = base['queries_ms'][q], tuned['queries_ms'][q]
+        print(f"{q + ' ms':<20}{b:>14.2f}{t:>14.2f}{_ratio(b, t):>10}")
+
+
+def _ratio(new, old):
+    if not old or not new:
+        return '-'
+    return f'{new / old:.2f}x'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ocr_results 索引与 SQLite 参数基准')
+    parser.add_argument('--rows', type=int, default=1000000, help='批量导入的行数')
+    parser.add_argument('--commit-batch', type=int, default=5, help='逐批提交时每个事务的行数')
+    parser.add_argument('--commits', type=int, default=200, help='逐批提交的事务数')
+    parser.add_argument('--out', default=os.path.join(_REPO_ROOT, 'benchmarks', 'results'),
+                        help='结果 JSON 目录或文件路径，留空不保存')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='ocr_db_bench_')
+    try:
+        results = [run_variant(workdir, 'baseline', False, args.rows, args.commit_batch, args.commits),
+                   run_variant(workdir, 'tuned', True, args.rows, args.commit_batch, args.commits)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"数据量: {args.rows} 行 + {args.commits} × {args.commit_batch} 行  结构版本: {SCHEMA_VERSION}")
+    print_report(results)
+
+    if args.out:
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'rows': args.rows,
+            'commit_batch': args.commit_batch,
+            'commits': args.commits,
+            'results': results,
+        }
+        path = args.out
+        if not path.lower().endswith('.json'):
+            os.makedirs(path, exist_ok=True)
+            path = os.path.join(path, f"db_{datetime.now():%Y%m%d_%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f'结果已保存: {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""去噪策略基准：在 test.jpg 上比较各去噪方式的耗时与识别效果
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_denoise [--image test.jpg] [--size 1280x720] [--repeat 5] [--ocr] [--expected 文本]
+
+耗时与准确率的取舍以 --ocr 的结果为准：用 OCRPipeline 识别各方式预处理后的图像，报告识别文本
+与置信度；给出 --expected（图中的真实文本）时另报告字符准确率，否则与全分辨率 NL-means 的识别文本比较。
+表中的 PSNR 只是与 NL-means 输出的图像相似度，不代表识别准确率。
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from difflib import SequenceMatcher
+
+import cv2
+import numpy as np
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from app.core.preprocess import DENOISE_METHODS, PreprocessEngine
+
+
+def _parse_size(text: str):
+    if not text:
+        return None
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def _ocr_text(pipeline, img):
+    text, conf, _ = pipeline.recognize(img)
+    return text, conf
+
+
+def _char_accuracy(text: str, expected: str) -> float:
+    """按最长公共子序列匹配的字符比例（1.0 表示完全一致）"""
+    if not expected:
+        return 1.0 if not text else 0.0
+    return SequenceMatcher(None, text, expected).ratio()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='去噪策略耗时/效果对比')
+    parser.add_argument('--image', default=os.path.join(_REPO_ROOT, 'test.jpg'))
+    parser.add_argument('--size', default='1280x720', help='先缩放到相机分辨率，留空则使用原图尺寸')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--ocr', action='store_true', help='比较各方式的 OCR 识别结果（需要 rapidocr）')
+    parser.add_argument('--expected', default='', help='图中的真实文本，用于计算字符准确率（配合 --ocr）')
+    parser.add_argument('--json', default='', help='将结果写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    img = cv2.imread(args.image)
+    if img is None:
+        print(f'[错误] 读图失败: {args.image}', file=sys.stderr)
+        return 1
+    size = _parse_size(args.size)
+    if size:
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+    base_cfg = {'convert_to_gray': True, 'denoising_enabled': True}
+    reference = PreprocessEngine(dict(base_cfg, denoise_method='nlmeans'), output='gray').process(img).copy()
+
+    pipeline = None
+    ref_text = None
+    if args.ocr:
+        from app.core.config import load_config
+        from app.services.ocr_pipeline import OCRPipeline
+        pipeline = OCRPipeline(load_config())
+        ref_text, _ = _ocr_text(pipeline, reference)
+
+    rows = []
+    for method in DENOISE_METHODS:
+        engine = PreprocessEngine(dict(base_cfg, denoise_method=method), output='gray')
+        engine.process(img)  # 预热：分配缓冲区
+        samples = []
+        for _ in range(max(1, args.repeat)):
+            engine.process(img)
+            samples.append(engine.last_timings.get('denoise', 0.0))
+        out = engine.process(img)
+        psnr = float('inf') if np.array_equal(out, reference) else float(cv2.PSNR(reference, out))
+        row = {
+            'method': method,
+            'denoise_ms_median': float(np.median(samples)),
+            'denoise_ms_max': float(np.max(samples)),
+            'similarity_psnr_vs_nlmeans_db': psnr,
+        }
+        if pipeline is not None:
+            text, conf = _ocr_text(pipeline, out)
+            target = args.expected or ref_text
+            row.update({'text': text, 'confidence': float(conf), 'text_matches': text == target,
+                        'char_accuracy': _char_accuracy(text, target)})
+        rows.append(row)
+
+    print(f'图像: {args.image}  尺寸: {img.shape[1]}x{img.shape[0]}  重复: {args.repeat}')
+    if pipeline is not None:
+        print(f"准确率参照: {'--expected 真实文本' if args.expected else 'NL-means 识别文本'}")
+        print(f"{'method':<20}{'median ms':>12}{'max ms':>10}{'char acc':>10}{'conf':>8}{'相似度 PSNR dB':>16}  text")
+        for r in rows:
+            mark = '=' if r['text_matches'] else '≠'
+            print(f"{r['method']:<20}{r['denoise_ms_median']:>12.1f}{r['denoise_ms_max']:>10.1f}"
+                  f"{r['char_accuracy']:>10.3f}{r['confidence']:>8.3f}{r['similarity_psnr_vs_nlmeans_db']:>16.2f}"
+                  f"  {mark} {r['text']}")
+    else:
+        print("未加 --ocr：只报告耗时与图像相似度，相似度不代表识别准确率")
+        print(f"{'method':<20}{'median ms':>12}{'max ms':>10}{'相似度 PSNR dB':>16}")
+        for r in rows:
+            print(f"{r['method']:<20}{r['denoise_ms_median']:>12.1f}{r['denoise_ms_max']:>10.1f}"
+                  f"{r['similarity_psnr_vs_nlmeans_db']:>16.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'image': args.image, 'size': [img.shape[1], img.shape[0]], 'expected': args.expected or None,
+                       'results': rows},
+                      f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""拍照 → 结果全链路基准：逐阶段统计 p50/p95/p99 延迟与吞吐
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_pipeline [--repeat 20] [--no-ocr] [--out benchmarks/results]
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<旧结果>.json
+
+语料固定为 test.jpg 及其确定性合成变体（缩放到相机分辨率、轻微旋转、高斯噪声、
+低对比度、模糊），阶段依次为：
+    preprocess  apply_preprocess（应用当前预处理配置）
+    ocr         OCRPipeline.recognize_lines（检测+识别，不含排序与合并；rapidocr 不可用或 --no-ocr 时跳过）
+    sort        sort_text_by_position
+    draw        draw_chinese_text
+    encode      快照 JPEG 编码（cv2.imencode，与 cv2.imwrite 默认质量一致）
+    save        persistence.save_many（单条写入临时 SQLite 库，与应用相同的结构与 PRAGMA，不影响应用数据）
+OCR 跳过时，sort/draw/save 使用固定的标签文本框。
+
+结果保存为 JSON（含 git 提交、平台与依赖版本），--compare 与旧结果逐阶段对比。
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from app.core.config import DEFAULT_CONFIG
+from app.core.preprocess import apply_preprocess
+from app.core.snapshot import dump_annotations
+from app.utils.annotation import draw_chinese_text
+from app.utils.text_order import sort_text_by_position
+
+STAGES = ('preprocess', 'ocr', 'sort', 'draw', 'encode', 'save')
+
+# OCR 不可用时使用的固定标签文本（坐标相对于 1280x720 画面）
+FIXTURE_BOXES = [
+    [[100, 200], [420, 200], [420, 260], [100, 260]],
+    [[440, 200], [760, 200], [760, 260], [440, 260]],
+    [[100, 300], [180, 300], [180, 350], [100, 350]],
+    [[200, 300], [320, 300], [320, 350], [200, 350]],
+]
+FIXTURE_TEXTS = ['2025/01/02', '生产日期', '合格', 'CH']
+FIXTURE_SCORES = [0.97, 0.99, 0.95, 0.93]
+
+
+def build_corpus(image_path: str, size=(1280, 720)):
+    """test.jpg 及其确定性合成变体，返回 [(名称, BGR 图像)]"""
+    base = cv2.imread(image_path)
+    if base is None:
+        raise FileNotFoundError(image_path)
+    frame = cv2.resize(base, size, interpolation=cv2.INTER_AREA)
+    rng = np.random.default_rng(0)
+    h, w = frame.shape[:2]
+    corpus = [('original', base), ('camera', frame)]
+    for angle in (-3, 3):
+        m = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        corpus.append((f'rotate{angle:+d}', cv2.warpAffine(frame, m, (w, h), borderMode=cv2.BORDER_REPLICATE)))
+    noise = rng.normal(0, 12, frame.shape)
+    corpus.append(('noise', np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)))
+    corpus.append(('low_contrast', cv2.convertScaleAbs(frame, alpha=0.5, beta=64)))
+    corpus.append(('blur', cv2.GaussianBlur(frame, (5, 5), 1.5)))
+    return corpus
+
+
+def summarize(samples_ms):
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    if arr.size == 0:
+        return None
+    mean = float(arr.mean())
+    return {
+        'n': int(arr.size),
+        'mean_ms': mean,
+        'p50_ms': float(np.percentile(arr, 50)),
+        'p95_ms': float(np.percentile(arr, 95)),
+        'p99_ms': float(np.percentile(arr, 99)),
+        'max_ms': float(arr.max()),
+        'throughput_per_s': 1000.0 / mean if mean > 0 else 0.0,
+    }
+
+
+def _timed(samples, stage, fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    samples[stage].append((time.perf_counter() - t0) * 1000.0)
+    return out
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_REPO_ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _environment():
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+    try:
+        import onnxruntime  # type: ignore
+        env['onnxruntime'] = onnxruntime.__version__
+    except Exception:
+        pass
+    return env
+
+
+def run(corpus, cfg, repeat: int, use_ocr: bool, warmup: int = 1):
+    from sqlalchemy import create_engine
+    from app.core.db import init_db, apply_sqlite_pragmas
+    from app.core.persistence import save_many
+
+    pipeline = None
+    if use_ocr:
+        from app.services.ocr_pipeline import OCRPipeline
+        pipeline = OCRPipeline(cfg)
+        pipeline._init_rapidocr()
+        if pipeline._rapid_ocr is None:
+            print('[提示] RapidOCR 不可用，跳过 ocr 阶段')
+            pipeline = None
+
+    pp_cfg = cfg.get('preprocess', {}) or {}
+    samples = {stage: [] for stage in STAGES}
+    tmpdir = tempfile.mkdtemp(prefix='ocr_bench_')
+    db_engine = apply_sqlite_pragmas(create_engine(f"sqlite:///{os.path.join(tmpdir, 'bench.sqlite3')}", future=True))
+    init_db(db_engine)
+    try:
+        for i in range(warmup + repeat):
+            record = i >= warmup
+            stage_samples = samples if record else {stage: [] for stage in STAGES}
+            for name, img in corpus:
+                if pp_cfg.get('enable_preprocess', True):
+                    processed = _timed(stage_samples, 'preprocess', apply_preprocess, img, pp_cfg)
+                else:
+                    processed = img
+
+                if pipeline is not None:
+                    boxes, texts, scores = _timed(stage_samples, 'ocr', pipeline.recognize_lines, processed)
+                else:
+                    boxes, texts, scores = FIXTURE_BOXES, FIXTURE_TEXTS, FIXTURE_SCORES
+
+                ordered = _timed(stage_samples, 'sort', sort_text_by_position, boxes, texts, scores)
+                if ordered:
+                    boxes, texts, scores = zip(*ordered)
+
+                canvas = processed if processed.ndim == 3 else cv2.cvtColor(processed, cv2.COLOR_GRAY2BGR)
+                annotated = _timed(stage_samples, 'draw', draw_chinese_text, canvas, boxes, texts, scores)
+                ok, buf = _timed(stage_samples, 'encode', cv2.imencode, '.jpg', annotated)
+
+                det_boxes_json = dump_annotations(boxes, texts, scores)
+                row = {'image_path': f'{name}.jpg', 'date_text': ' '.join(texts),
+                       'confidence': float(np.mean(scores)) if len(scores) else 0.0,
+                       'det_boxes_json': det_boxes_json}
+                _timed(stage_samples, 'save', save_many, [row], db_engine)
+    finally:
+        db_engine.dispose()
+
+    stats = {stage: summarize(values) for stage, values in samples.items() if values}
+    per_image = [sum(v) for v in zip(*(samples[s] for s in stats))] if stats else []
+    return stats, summarize(per_image)
+
+
+def print_report(stats, total, baseline=None):
+    header = f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'ops/s':>10}"
+    if baseline:
+        header += f"{'Δp50':>10}{'Δp95':>10}"
+    print(header)
+    rows = list(stats.items()) + ([('total', total)] if total else [])
+    base_stages = dict((baseline or {}).get('stages', {}))
+    if baseline and baseline.get('total'):
+        base_stages['total'] = baseline['total']
+    for stage, s in rows:
+        line = (f"{stage:<12}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+                f"{s['max_ms']:>10.2f}{s['throughput_per_s']:>10.1f}")
+        b = base_stages.get(stage)
+        if b:
+            line += f"{_pct(s['p50_ms'], b['p50_ms']):>10}{_pct(s['p95_ms'], b['p95_ms']):>10}"
+        print(line)
+
+
+def _pct(new, old):
+    if not old:
+        return '-'
+    return f'{(new - old) / old * 100:+.1f}%'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='拍照→结果全链路基准（p50/p95/p99）')
+    parser.add_argument('--image', default=os.path.join(_REPO_ROOT, 'test.jpg'))
+    parser.add_argument('--repeat', type=int, default=20, help='语料重复轮数（另有 1 轮预热不计入）')
+    parser.add_argument('--no-ocr', action='store_true', help='跳过 OCR 阶段（其余阶段使用固定文本框）')
+    parser.add_argument('--app-config', action='store_true', help='使用应用数据库中的配置（默认使用 DEFAULT_CONFIG）')
+    parser.add_argument('--out', default=os.path.join(_REPO_ROOT, 'benchmarks', 'results'),
+                        help='结果 JSON 目录或文件路径，留空不保存')
+    parser.add_argument('--compare', default='', help='与之前保存的结果 JSON 对比')
+    args = parser.parse_args(argv)
+
+    if args.app_config:
+        from app.core.config import load_config
+        cfg = load_config()
+    else:
+        cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+
+    corpus = build_corpus(args.image)
+    stats, total = run(corpus, cfg, max(1, args.repeat), use_ocr=not args.no_ocr)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"对比基线: {args.compare} (commit {baseline.get('commit')})")
+    print(f"语料: {len(corpus)} 张 × {args.repeat} 轮  commit: {_git_commit()}")
+    print_report(stats, total, baseline)
+
+    if args.out:
+        commit = _git_commit()
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'environment': _environment(),
+            'corpus': [{'name': n, 'size': [im.shape[1], im.shape[0]]} for n, im in corpus],
+            'repeat': args.repeat,
+            'ocr': 'ocr' in stats,
+            'stages': stats,
+            'total': total,
+        }
+        path = args.out
+        if not path.lower().endswith('.json'):
+            os.makedirs(path, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(path, f"pipeline_{stamp}_{commit or 'nogit'}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'结果已保存: {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())